@@ -0,0 +1 @@
+"""Benchmarks, run from the root of the repository with ``python -m benchmarks.<name>``"""
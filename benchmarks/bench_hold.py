@@ -0,0 +1,84 @@
+"""Per-call overhead of scripted calls while ``gui.hold`` is set
+
+Compares the nested event loop of ``wait_for_future``, used by
+``protected_thread``, with the polling loop it replaced, which called
+``processEvents`` and slept 100 ms until the call had finished.
+
+Usage::
+
+    python -m benchmarks.bench_hold [n_calls]
+
+Run it from the root of the repository.
+
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from pyvista_gui.utilities import get_worker_pool, protected_thread, wait_for_future  # noqa: E402
+
+
+class Parent(object):
+    hold = True
+
+    def __init__(self, app):
+        self.app = app
+
+    def show_error(self, *args):
+        pass
+
+
+class Item(object):
+    """Minimal stand-in for a ``GuiCommon`` object"""
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    def store_command(self, command):
+        pass
+
+    @protected_thread
+    def noop(self):
+        pass
+
+
+def poll(app, future):
+    """The wait removed from ``protected_thread``"""
+    while not future.done():
+        app.processEvents()
+        time.sleep(0.1)
+
+
+def main(n_calls=20):
+    app = QApplication.instance() or QApplication([])
+    item = Item(Parent(app))
+    pool = get_worker_pool()
+
+    tstart = time.perf_counter()
+    for _ in range(n_calls):
+        poll(app, pool.submit(item.noop.__wrapped__, item))
+    polling = (time.perf_counter() - tstart) / n_calls
+
+    tstart = time.perf_counter()
+    for _ in range(n_calls):
+        wait_for_future(pool.submit(item.noop.__wrapped__, item))
+    event_loop = (time.perf_counter() - tstart) / n_calls
+
+    tstart = time.perf_counter()
+    for _ in range(n_calls):
+        item.noop()
+    protected = (time.perf_counter() - tstart) / n_calls
+
+    print("per call over %d calls" % n_calls)
+    print("  polling (before)      %8.3f ms" % (polling * 1000))
+    print("  nested event loop     %8.3f ms" % (event_loop * 1000))
+    print("  protected_thread      %8.3f ms" % (protected * 1000))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
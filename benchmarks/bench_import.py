@@ -0,0 +1,72 @@
+"""Import and startup time of pyvista_gui
+
+Each measurement runs in a fresh interpreter.  ``import pyvista_gui``
+is timed with ``-X importtime`` and compared with importing
+``pyvista_gui.gui``, which loads Qt, VTK and pyvista as the star
+imports of the package used to.  ``python -m pyvista_gui --help`` is
+timed end to end.
+
+Usage::
+
+    python -m benchmarks.bench_import [--repeat N] [--max-import-ms MS]
+
+Run it from the root of the repository.
+
+Exits with status 1 when ``import pyvista_gui`` takes longer than
+``--max-import-ms``, to guard against regressions.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(args):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    tstart = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable] + args, env=env, capture_output=True, text=True, check=True
+    )
+    return time.perf_counter() - tstart, process.stderr
+
+
+def import_time(module):
+    """Cumulative import time of ``module`` in seconds"""
+    _, stderr = run(["-X", "importtime", "-c", "import %s" % module])
+    for line in reversed(stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError("%s not found in -X importtime output" % module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    results = {
+        "import pyvista_gui": min(import_time("pyvista_gui") for _ in range(args.repeat)),
+        "import pyvista_gui.gui (eager)": min(
+            import_time("pyvista_gui.gui") for _ in range(args.repeat)
+        ),
+        "python -m pyvista_gui --help": min(
+            run(["-m", "pyvista_gui", "--help"])[0] for _ in range(args.repeat)
+        ),
+    }
+    for name, seconds in results.items():
+        print("%-32s %8.1f ms" % (name, seconds * 1000))
+
+    if args.max_import_ms is not None and results["import pyvista_gui"] * 1000 > args.max_import_ms:
+        print("import pyvista_gui exceeds %.1f ms" % args.max_import_ms)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
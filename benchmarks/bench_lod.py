@@ -0,0 +1,75 @@
+"""Frame times while the camera moves, with and without LOD proxies
+
+A sphere with about ``n_cells`` cells is rendered off screen while the
+camera orbits it, first at full resolution and then swapped for its
+proxy as ``LODManager`` does during an interaction.
+
+Usage::
+
+    python -m benchmarks.bench_lod [n_cells] [n_frames]
+
+Run it from the root of the repository.
+
+"""
+
+import math
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pyvista  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from pyvista_gui.lod import LODManager  # noqa: E402
+from pyvista_gui.options import rcParams  # noqa: E402
+
+
+def orbit(plotter, n_frames):
+    """Mean render time of ``n_frames`` frames orbiting the scene"""
+    times = []
+    for _ in range(n_frames):
+        plotter.camera.azimuth += 360.0 / n_frames
+        tstart = time.perf_counter()
+        plotter.render()
+        times.append(time.perf_counter() - tstart)
+    return sum(times) / len(times)
+
+
+def main(n_cells=4000000, n_frames=30):
+    app = QApplication.instance() or QApplication([])
+    resolution = int(math.sqrt(n_cells / 2.0))
+    mesh = pyvista.Sphere(theta_resolution=resolution, phi_resolution=resolution)
+    mesh["elevation"] = mesh.points[:, 2]
+
+    plotter = pyvista.Plotter(off_screen=True, window_size=[1024, 768])
+    actor = plotter.add_mesh(mesh, scalars="elevation")
+    plotter.show(auto_close=False)
+    gui_mesh = SimpleNamespace(mesh=mesh, actor=actor, varname="Mesh0")
+
+    manager = LODManager(plotter)
+    tstart = time.perf_counter()
+    future = manager.add(gui_mesh)
+    if future is None:
+        sys.exit("%d cells do not exceed rcParams['lod_threshold']" % mesh.n_cells)
+    future.result()
+    # delivers the finished proxy to _add_proxy
+    app.processEvents()
+    proxy_time = time.perf_counter() - tstart
+
+    full = orbit(plotter, n_frames)
+    manager._start_interaction()
+    lod = orbit(plotter, n_frames)
+    manager._end_interaction()
+
+    print("%d cells, proxy budget %d cells" % (mesh.n_cells, rcParams["lod_budget"]))
+    print("  proxy computed in      %8.1f ms" % (proxy_time * 1000))
+    print("  full resolution frame  %8.1f ms" % (full * 1000))
+    print("  LOD proxy frame        %8.1f ms" % (lod * 1000))
+    plotter.close()
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,113 @@
+"""Sustained playback frame rate of a synthetic time series
+
+Writes ``n_steps`` structured grids of about ``n_cells`` cells whose
+points and point data change every step, then plays them in the gui
+for two loops with ``TimeSeriesPlayer``, with
+``rcParams["playback_mesh_cache"]`` on.  The first loop reads the
+files, the second is served by the mesh cache.  For comparison, the
+steps are also shown the way a script would without the player: each
+step read when it is due and its actor rebuilt.
+
+Usage::
+
+    python -m benchmarks.bench_playback [n_cells] [n_steps] [fps]
+
+Run it from the root of the repository.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+import pyvista  # noqa: E402
+from PyQt5.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from pyvista_gui.gui import GUIWindow  # noqa: E402
+from pyvista_gui.options import rcParams  # noqa: E402
+
+
+def write_series(directory, n_cells, n_steps):
+    n = int(round(n_cells ** (1 / 3.0))) + 1
+    x, y, z = np.meshgrid(*[np.linspace(0, 1, n)] * 3, indexing="ij")
+    filenames = []
+    for step in range(n_steps):
+        phase = 2 * np.pi * step / n_steps
+        grid = pyvista.StructuredGrid(x + 0.05 * np.sin(2 * np.pi * z + phase), y, z)
+        grid["pressure"] = np.sin(4 * np.pi * grid.points[:, 0] + phase).astype(np.float32)
+        filenames.append(os.path.join(directory, "step_%04d.vts" % step))
+        grid.save(filenames[-1])
+    return filenames
+
+
+def spin(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+
+def rebuild(gui, filenames):
+    """Frame rate reading each step when due and rebuilding its actor"""
+    tstart = time.perf_counter()
+    for filename in filenames:
+        gui.plotter.add_mesh(pyvista.read(filename), name="rebuilt", reset_camera=False)
+        gui.plotter.render()
+    fps = len(filenames) / (time.perf_counter() - tstart)
+    gui.plotter.remove_actor("rebuilt")
+    return fps
+
+
+def play_loop(player):
+    """Stats of playing the whole series once"""
+    player.index = player.last
+    player.n_shown = player.n_stalls = 0
+    loop = QEventLoop()
+
+    def on_frame_changed(index):
+        if index == player.last:
+            loop.quit()
+
+    player.frame_changed.connect(on_frame_changed)
+    player.play()
+    loop.exec_()
+    player.pause()
+    player.frame_changed.disconnect(on_frame_changed)
+    return player.stats
+
+
+def main(n_cells=1000000, n_steps=20, fps=24):
+    app = QApplication.instance() or QApplication([])
+    gui = GUIWindow(app=app, off_screen_vtk=True, show=False)
+    directory = tempfile.mkdtemp(prefix="pyvista_gui_bench_")
+    mesh_cache = rcParams["playback_mesh_cache"]
+    rcParams["playback_mesh_cache"] = True
+    try:
+        filenames = write_series(directory, n_cells, n_steps)
+        n_cells = pyvista.read(filenames[0]).n_cells
+        baseline = rebuild(gui, filenames)
+
+        player = gui.data.load_time_series(filenames)
+        player.fps = fps
+        spin(0.5)
+        first = play_loop(player)
+        second = play_loop(player)
+        player.close()
+
+        print("%d steps of %d cells, target %d fps" % (n_steps, n_cells, fps))
+        print("  read and rebuild      %6.1f fps" % baseline)
+        for name, stats in [("player, first loop", first), ("player, cached loop", second)]:
+            print("  %-20s  %6.1f fps, %d stalls" % (name, stats["fps"], stats["stalls"]))
+    finally:
+        rcParams["playback_mesh_cache"] = mesh_cache
+        shutil.rmtree(directory, ignore_errors=True)
+        gui.close()
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
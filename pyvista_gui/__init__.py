@@ -1,8 +1,66 @@
+"""PyVista-GUI
+
+Submodules are imported on first access of one of their attributes, so
+``import pyvista_gui`` does not import Qt, VTK or IPython.
+"""
+
+import importlib
+
 from pyvista_gui._version import __version__
-from pyvista_gui.console import *
-from pyvista_gui.constants import *
-from pyvista_gui.data import *
-from pyvista_gui.gui import *
-from pyvista_gui.options import *
-from pyvista_gui.utilities import *
-from pyvista_gui.widgets import *
+
+# public attribute -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    "MeshCache": "cache",
+    "QIPythonWidget": "console",
+    "assigned_names": "console",
+    "PY_FILE_FILTER": "constants",
+    "Data": "data",
+    "GUIWindow": "gui",
+    "CommandJournal": "journal",
+    "CommandRecord": "journal",
+    "LODManager": "lod",
+    "LoadCancelled": "loader",
+    "MeshLoader": "loader",
+    "StreamingMeshLoader": "loader",
+    "GuiMesh": "mesh",
+    "MultiBlockModel": "models",
+    "RcParams": "options",
+    "rcParams": "options",
+    "PerfMonitor": "perf",
+    "PerformanceWidget": "perf",
+    "FrameCache": "playback",
+    "PlaybackWidget": "playback",
+    "TimeSeriesPlayer": "playback",
+    "RenderScheduler": "render",
+    "ScriptRunner": "script",
+    "split_statements": "script",
+    "BATCH": "utilities",
+    "INTERACTIVE": "utilities",
+    "WorkerPool": "utilities",
+    "build_command": "utilities",
+    "dark_stylesheet": "utilities",
+    "get_worker_pool": "utilities",
+    "protected_thread": "utilities",
+    "threaded": "utilities",
+    "wait_for_future": "utilities",
+    "CommandHistoryModel": "widgets",
+    "CommandHistoryWidget": "widgets",
+    "QTextEditLogger": "widgets",
+    "TreeWidget": "widgets",
+}
+
+__all__ = ["__version__"] + sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    value = getattr(importlib.import_module("%s.%s" % (__name__, module_name)), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,22 +1,44 @@
+import argparse
 import logging
 import os
 import sys
 
-from PyQt5.QtWidgets import QApplication
-
-from pyvista_gui.gui import GUIWindow
-
 LOG = logging.getLogger(__name__)
 LOG.setLevel("DEBUG")
 
 
-def main(debug=False, loglevel="DEBUG", script=None, off_screen_vtk=False):  # pragma: no cover
-    """Starts the PyVista GUI"""
+def main(
+    debug=False,
+    loglevel="DEBUG",
+    script=None,
+    off_screen_vtk=False,
+    batch=None,
+    output=".",
+    fmt="png",
+    window_size=(1024, 768),
+    orbit=0,
+    processes=None,
+):  # pragma: no cover
+    """Starts the PyVista GUI
+
+    When ``batch`` is a list of saved command scripts, they are rendered
+    off screen to ``output`` instead and no Qt widgets are created.
+    """
+    if batch:
+        loglevel = loglevel if debug else "INFO"
+        return batch_main(batch, output, fmt, window_size, orbit, loglevel, processes)
+
+    # imported here so that "--help" does not import Qt and VTK
+    from PyQt5.QtWidgets import QApplication
+
+    from pyvista_gui.gui import GUIWindow
 
     logging.getLogger().setLevel("CRITICAL")
 
     app = QApplication(sys.argv)
     gui = GUIWindow(app=app, off_screen_vtk=off_screen_vtk)
+    if debug:
+        logging.getLogger().setLevel(loglevel)
 
     # icon_file = resource_path('icon.ico')
     # if os.path.isfile(icon_file):
@@ -25,25 +47,129 @@ def main(debug=False, loglevel="DEBUG", script=None, off_screen_vtk=False):  # p
     # else:
     #     LOG.warning('Unable to find icon file')
 
-    # if script is not None:
-    #     if os.path.isfile(script):
-    #         exec('gui.data.load_script("%s")' % script)
-    #     else:
-    #         gui.show_error('Unable to find python script file "%s"\n' % str(script)
-    #                        + 'Try using absolute paths or loading it from '
-    #                        + 'the GUI.')
+    def chdir_home(*args):
+        # always start in home directory
+        try:
+            from pathlib import Path
+
+            home = str(Path.home())
+            os.chdir(home)
+        except:
+            LOG.warning("Unable to change to home directory")
 
-    # always start in home directory
-    try:
-        from pathlib import Path
+    runner = None
+    if script is not None:
+        # resolve before changing to the home directory
+        runner = gui.data.load_script(os.path.abspath(script))
 
-        home = str(Path.home())
-        os.chdir(home)
-    except:
-        LOG.warning("Unable to change to home directory")
+    if runner is not None and runner.running:
+        # the script runs from the event loop, keep its working directory
+        runner.finished.connect(chdir_home)
+    else:
+        chdir_home()
 
     app.exec_()
 
 
+def parse_args(args=None):
+    """Parses command line arguments"""
+    from pyvista_gui._version import __version__
+
+    parser = argparse.ArgumentParser(
+        prog="python -m pyvista_gui", description="Starts the PyVista GUI"
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    parser.add_argument("--script", help="Python script to run once the GUI has started")
+    parser.add_argument(
+        "--off-screen-vtk",
+        action="store_true",
+        dest="off_screen_vtk",
+        help="Render off screen instead of in the viewer",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable logging")
+    parser.add_argument("--loglevel", default="DEBUG", help="Log level when debugging")
+
+    batch = parser.add_argument_group("headless batch rendering")
+    batch.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="SCRIPT",
+        help="Render saved command scripts off screen without starting the GUI",
+    )
+    batch.add_argument("--output", default=".", help="Directory for the rendered files")
+    batch.add_argument(
+        "--format", default="png", help="Image format, or gif/mp4 for an orbit animation"
+    )
+    batch.add_argument(
+        "--window-size",
+        nargs=2,
+        type=int,
+        default=[1024, 768],
+        metavar=("WIDTH", "HEIGHT"),
+        help="Size of the rendered images",
+    )
+    batch.add_argument("--orbit", type=int, default=0, help="Number of frames of animations")
+    batch.add_argument(
+        "--processes",
+        type=int,
+        help="Render the orbit frames of each script as images across this many processes, "
+        "not supported for gif/mp4",
+    )
+    return parser.parse_args(args)
+
+
+def batch_main(
+    scripts,
+    output=".",
+    fmt="png",
+    window_size=(1024, 768),
+    orbit=0,
+    loglevel="INFO",
+    processes=None,
+):
+    """Renders scripts off screen without building the GUI"""
+    from pyvista_gui.batch import ANIMATION_FORMATS, render_parallel, run_batch
+
+    logging.basicConfig(level=loglevel, format="%(name)-20s - %(levelname)-8s - %(message)s")
+    if not processes:
+        written = run_batch(scripts, output, fmt=fmt, window_size=window_size, orbit_frames=orbit)
+        return 0 if len(written) == len(scripts) else 1
+
+    if fmt in ANIMATION_FORMATS:
+        LOG.error("--processes writes the orbit frames as images, use an image --format")
+        return 2
+
+    n_failed = 0
+    for script in scripts:
+        name = os.path.splitext(os.path.basename(script))[0]
+        try:
+            render_parallel(
+                script,
+                os.path.join(output, name),
+                n_frames=orbit or 36,
+                processes=processes,
+                window_size=window_size,
+                fmt=fmt,
+            )
+        except Exception as exception:
+            LOG.error("Unable to render %s: %s", script, exception)
+            n_failed += 1
+    return 1 if n_failed else 0
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    sys.exit(
+        main(
+            args.debug,
+            args.loglevel,
+            args.script,
+            args.off_screen_vtk,
+            batch=args.batch,
+            output=args.output,
+            fmt=args.format,
+            window_size=args.window_size,
+            orbit=args.orbit,
+            processes=args.processes,
+        )
+    )
@@ -0,0 +1,393 @@
+"""Headless rendering of saved command scripts
+
+Scripts written by ``Data._save_commands`` are replayed against an
+off-screen ``pyvista.Plotter`` without building any Qt widgets.  Use a
+VTK built with OSMesa or EGL to render on machines without a display.
+
+Examples
+--------
+>>> from pyvista_gui.batch import run_batch
+>>> run_batch(['session_a.py', 'session_b.py'], 'figures')
+['figures/session_a.png', 'figures/session_b.png']
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pyvista
+
+from pyvista_gui.mesh_arrays import arrays_to_dataset, dataset_to_arrays
+
+try:
+    from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+    from vtkmodules.vtkCommonCore import vtkLookupTable
+except ImportError:  # pragma: no cover
+    from vtk import vtkLookupTable
+    from vtk.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+ANIMATION_FORMATS = ["gif", "mp4"]
+
+
+def new_plotter(window_size=(1024, 768)):
+    """Creates an off-screen plotter ready to write images"""
+    plotter = pyvista.Plotter(off_screen=True, window_size=list(window_size))
+    # creates the render window once, later frames only need a render
+    plotter.show(auto_close=False)
+    return plotter
+
+
+def script_meshes(namespace):
+    """Datasets defined in a script namespace, in order of definition"""
+    return [
+        (name, value)
+        for name, value in namespace.items()
+        if not name.startswith("_") and isinstance(value, (pyvista.DataSet, pyvista.MultiBlock))
+    ]
+
+
+def exec_script(filename, plotter=None):
+    """Executes a command script and returns its namespace"""
+    with open(filename) as f:
+        source = f.read()
+
+    namespace = {
+        "__name__": "__main__",
+        "__file__": filename,
+        "pyvista": pyvista,
+        "plotter": plotter,
+    }
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace
+
+
+def run_script(filename, plotter):
+    """Replays a command script and returns its namespace
+
+    The script may reference the off-screen plotter as ``plotter``.
+    When the script does not add anything to the plotter, every dataset
+    it defines is added.
+    """
+    plotter.clear()
+    namespace = exec_script(filename, plotter)
+
+    if not plotter.renderer.actors:
+        for name, mesh in script_meshes(namespace):
+            plotter.add_mesh(mesh, name=name, reset_camera=False)
+        plotter.reset_camera()
+    return namespace
+
+
+def write_orbit(plotter, filename, n_frames):
+    """Writes an animation orbiting the camera once around the scene"""
+    if filename.endswith(".gif"):
+        plotter.open_gif(filename)
+    else:
+        plotter.open_movie(filename)
+
+    step = 360.0 / n_frames
+    for _ in range(n_frames):
+        plotter.camera.Azimuth(step)
+        plotter.render()
+        plotter.write_frame()
+
+    plotter.mwriter.close()
+    plotter.mwriter = None
+
+
+def render_script(filename, output, plotter, orbit_frames=0):
+    """Replays a script and writes a screenshot or orbit animation to ``output``"""
+    run_script(filename, plotter)
+    if orbit_frames:
+        write_orbit(plotter, output, orbit_frames)
+    else:
+        plotter.render()
+        plotter.screenshot(output)
+    return output
+
+
+def run_batch(scripts, output_dir, fmt="png", window_size=(1024, 768), orbit_frames=0):
+    """Renders each script to an image or animation in ``output_dir``
+
+    A single off-screen plotter is reused for all scripts.  A script
+    that fails is logged and skipped.
+
+    Parameters
+    ----------
+    scripts : list of str
+        Command scripts, for example saved with "Save Commands...".
+
+    output_dir : str
+        Directory to write to.  Created when it does not exist.
+
+    fmt : str, optional
+        Output format: an image format supported by ``Plotter.screenshot``
+        or ``"gif"`` or ``"mp4"`` for an orbit animation.
+
+    window_size : tuple, optional
+        Size of the images in pixels.
+
+    orbit_frames : int, optional
+        Number of frames of orbit animations.  Defaults to 36.
+
+    Returns
+    -------
+    list of str
+        Files written.
+
+    """
+    if fmt in ANIMATION_FORMATS and not orbit_frames:
+        orbit_frames = 36
+    elif fmt not in ANIMATION_FORMATS:
+        orbit_frames = 0
+
+    os.makedirs(output_dir, exist_ok=True)
+    plotter = new_plotter(window_size)
+    written = []
+    try:
+        for script in scripts:
+            name = os.path.splitext(os.path.basename(script))[0]
+            output = os.path.join(output_dir, "%s.%s" % (name, fmt))
+            try:
+                render_script(script, output, plotter, orbit_frames)
+            except Exception as exception:
+                LOG.error("Unable to render %s: %s", script, exception)
+                continue
+            LOG.info("Wrote %s", output)
+            written.append(output)
+    finally:
+        plotter.close()
+    return written
+
+
+def orbit_camera_positions(meshes, n_frames, elevation=0.5):
+    """Camera positions orbiting once around the bounds of ``meshes``"""
+    bounds = np.array([mesh.bounds for mesh in meshes]).reshape(-1, 3, 2)
+    lower = bounds[:, :, 0].min(axis=0)
+    upper = bounds[:, :, 1].max(axis=0)
+    center = (lower + upper) / 2
+    radius = 2 * np.linalg.norm(upper - lower)
+
+    positions = []
+    for i in range(n_frames):
+        angle = 2 * math.pi * i / n_frames
+        offset = radius * np.array([math.cos(angle), math.sin(angle), elevation])
+        positions.append([tuple(center + offset), tuple(center), (0.0, 0.0, 1.0)])
+    return positions
+
+
+def _share_arrays(arrays):
+    """Copies arrays to shared memory once, returns the blocks and their specs"""
+    blocks = []
+    specs = {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+        blocks.append(shm)
+        specs[key] = (shm.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def scene_actors(plotter):
+    """Names, datasets and actors of the meshes shown by ``plotter``"""
+    actors = []
+    for name, actor in plotter.renderer.actors.items():
+        mapper = actor.GetMapper() if hasattr(actor, "GetMapper") else None
+        if mapper is not None and mapper.GetNumberOfInputConnections(0):
+            # pyvista may feed the mapper through a filter not run before the first render
+            mapper.GetInputAlgorithm().Update()
+        if mapper is None or mapper.GetInputDataObject(0, 0) is None:
+            continue  # scalar bars, text and other 2D actors
+        actors.append((name, pyvista.wrap(mapper.GetInputDataObject(0, 0)), actor))
+    return actors
+
+
+def actor_style(actor):
+    """Styling of an actor, restored on another actor by ``apply_style``"""
+    prop = actor.GetProperty()
+    mapper = actor.GetMapper()
+    style = {
+        "visibility": actor.GetVisibility(),
+        "color": prop.GetColor(),
+        "opacity": prop.GetOpacity(),
+        "show_edges": prop.GetEdgeVisibility(),
+        "edge_color": prop.GetEdgeColor(),
+        "scalar_visibility": mapper.GetScalarVisibility(),
+        "scalar_mode": mapper.GetScalarMode(),
+        "scalars": mapper.GetArrayName(),
+        "scalar_range": mapper.GetScalarRange(),
+        "color_mode": mapper.GetColorMode(),
+        "interpolate_scalars": mapper.GetInterpolateScalarsBeforeMapping(),
+        "lookup_table": None,
+    }
+    lut = mapper.GetLookupTable()
+    if isinstance(lut, vtkLookupTable):
+        style["lookup_table"] = (vtk_to_numpy(lut.GetTable()).copy(), lut.GetRange())
+    return style
+
+
+def apply_style(actor, style):
+    """Styles an actor as described by ``actor_style``"""
+    actor.SetVisibility(style["visibility"])
+    prop = actor.GetProperty()
+    prop.SetColor(style["color"])
+    prop.SetOpacity(style["opacity"])
+    prop.SetEdgeVisibility(style["show_edges"])
+    prop.SetEdgeColor(style["edge_color"])
+
+    mapper = actor.GetMapper()
+    mapper.SetScalarVisibility(style["scalar_visibility"])
+    mapper.SetScalarMode(style["scalar_mode"])
+    if style["scalars"]:
+        mapper.SelectColorArray(style["scalars"])
+    mapper.SetScalarRange(style["scalar_range"])
+    mapper.SetColorMode(style["color_mode"])
+    mapper.SetInterpolateScalarsBeforeMapping(style["interpolate_scalars"])
+    if style["lookup_table"] is not None:
+        table, table_range = style["lookup_table"]
+        lut = vtkLookupTable()
+        lut.SetNumberOfTableValues(len(table))
+        lut.SetTable(numpy_to_vtk(table, deep=True))
+        lut.SetRange(table_range)
+        mapper.SetLookupTable(lut)
+
+
+# state of a render worker process
+_WORKER = {}
+
+
+def _init_worker(scene, background, window_size):
+    """Rebuilds the scene in a worker from arrays in shared memory"""
+    plotter = new_plotter(window_size)
+    plotter.set_background(background)
+    blocks = []
+    for name, meta, specs, style in scene:
+        arrays = {}
+        for key, (shm_name, shape, dtype) in specs.items():
+            shm = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(shm)
+            arrays[key] = np.ndarray(shape, dtype, buffer=shm.buf)
+        actor = plotter.add_mesh(
+            arrays_to_dataset(meta, arrays), name=name, reset_camera=False, show_scalar_bar=False
+        )
+        apply_style(actor, style)
+    _WORKER.update(plotter=plotter, blocks=blocks)
+
+
+def _render_frames(frames):
+    """Renders a slice of ``(camera_position, filename)`` frames in a worker"""
+    plotter = _WORKER["plotter"]
+    for camera_position, filename in frames:
+        plotter.camera_position = camera_position
+        plotter.render()
+        plotter.screenshot(filename)
+    return [filename for _, filename in frames]
+
+
+def render_parallel(
+    script,
+    output_dir,
+    camera_positions=None,
+    n_frames=36,
+    processes=None,
+    window_size=(1024, 768),
+    fmt="png",
+):
+    """Renders frames of a script from many camera positions across processes
+
+    The script is replayed once against an off-screen plotter, which it
+    may reference as ``plotter`` as in ``run_batch``.  The arrays of the
+    meshes shown are placed in shared memory, from which each worker
+    process rebuilds the scene with the same styling without reading any
+    files, and each worker renders a contiguous slice of the frames off
+    screen.
+
+    Parameters
+    ----------
+    script : str
+        Command script, for example saved with "Save Commands...".
+
+    output_dir : str
+        Directory the frames are written to as ``frame_00000.png``, ...
+
+    camera_positions : list, optional
+        Camera positions to render.  Defaults to ``n_frames`` positions
+        orbiting the scene.
+
+    n_frames : int, optional
+        Number of orbit frames when ``camera_positions`` is not given.
+
+    processes : int, optional
+        Number of worker processes.  Defaults to the number of cores.
+
+    window_size : tuple, optional
+        Size of the frames in pixels.
+
+    fmt : str, optional
+        Image format of the frames, supported by ``Plotter.screenshot``.
+        Animations are not supported.
+
+    Returns
+    -------
+    list of str
+        Frames written, in order.
+
+    """
+    if fmt in ANIMATION_FORMATS:
+        raise ValueError("Frames rendered in parallel can not be written as %s" % fmt)
+    plotter = pyvista.Plotter(off_screen=True)
+    blocks = []
+    try:
+        run_script(script, plotter)
+        actors = scene_actors(plotter)
+        if not actors:
+            raise ValueError("%s does not define any datasets" % script)
+        if camera_positions is None:
+            camera_positions = orbit_camera_positions([mesh for _, mesh, _ in actors], n_frames)
+
+        os.makedirs(output_dir, exist_ok=True)
+        frames = [
+            (camera_position, os.path.join(output_dir, "frame_%05d.%s" % (i, fmt)))
+            for i, camera_position in enumerate(camera_positions)
+        ]
+        processes = min(processes or os.cpu_count() or 1, len(frames))
+        chunk = int(math.ceil(len(frames) / float(processes)))
+
+        scene = []
+        for name, mesh, actor in actors:
+            meta, arrays = dataset_to_arrays(mesh)
+            mesh_blocks, specs = _share_arrays(arrays)
+            blocks.extend(mesh_blocks)
+            scene.append((name, meta, specs, actor_style(actor)))
+        background = plotter.renderer.GetBackground()
+        # the workers only need the shared copies
+        del actors
+        plotter.close()
+
+        # VTK is not fork safe, always start fresh interpreters
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(scene, background, tuple(window_size)),
+        ) as executor:
+            slices = [frames[i : i + chunk] for i in range(0, len(frames), chunk)]
+            written = []
+            for filenames in executor.map(_render_frames, slices):
+                written.extend(filenames)
+    finally:
+        plotter.close()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    LOG.info("Rendered %d frames of %s with %d processes", len(written), script, processes)
+    return written
@@ -0,0 +1,167 @@
+"""On-disk cache of parsed mesh files"""
+
+import hashlib
+import logging
+import os
+import threading
+
+from pyvista_gui.mesh_arrays import (
+    arrays_to_dataset,
+    dataset_to_arrays,
+    read_container,
+    write_container,
+)
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+CACHE_EXTENSION = ".pvcache"
+
+
+class MeshCache(object):
+    """Size bounded, least recently used cache of parsed mesh files
+
+    Datasets are stored as container files (see
+    ``mesh_arrays.write_container``) keyed on the absolute path, size and
+    modification time of the source file, so a changed file is never
+    served from the cache.  Cached datasets are memory-mapped rather than
+    parsed.  Entries are evicted, least recently used first, once the
+    cache exceeds ``max_size`` bytes.
+
+    Examples
+    --------
+    >>> gui.data.cache
+    MeshCache(hits=12, misses=3, evictions=0, entries=3, size=1.2 GiB)
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        stats = self.stats
+        return "MeshCache(hits=%d, misses=%d, evictions=%d, entries=%d, size=%.1f GiB)" % (
+            stats["hits"],
+            stats["misses"],
+            stats["evictions"],
+            stats["entries"],
+            stats["size"] / 1024.0**3,
+        )
+
+    def _entry(self, filename):
+        """Path of the cache entry of ``filename``"""
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        key = "%s|%d|%d" % (filename, stat.st_size, stat.st_mtime_ns)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + CACHE_EXTENSION)
+
+    def _entries(self):
+        """``(last used, size, path)`` of every entry"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    @property
+    def stats(self):
+        """Cache statistics"""
+        entries = self._entries()
+        n_requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / n_requests if n_requests else 0.0,
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+        }
+
+    def get(self, filename):
+        """Returns the cached dataset of ``filename`` or ``None``
+
+        An entry that can not be read, for example one written by another
+        version, is removed and counted as a miss.
+        """
+        entry = self._entry(filename)
+        try:
+            meta, arrays = read_container(entry)
+            mesh = arrays_to_dataset(meta, arrays)
+        except Exception as exception:
+            if not isinstance(exception, FileNotFoundError):
+                LOG.warning("Removing unreadable cache entry of %s: %s", filename, exception)
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # the modification time of an entry is its last use
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        LOG.debug("Loaded %s from cache", filename)
+        return mesh
+
+    def put(self, filename, mesh):
+        """Stores the dataset read from ``filename``
+
+        Datasets larger than ``max_size`` are not stored.  Errors writing
+        the entry, such as a full disk, are raised.
+
+        Returns
+        -------
+        bool
+            ``True`` when the dataset was stored.
+
+        """
+        try:
+            meta, arrays = dataset_to_arrays(mesh)
+        except TypeError as exception:
+            LOG.debug("Not caching %s: %s", filename, exception)
+            return False
+        size = sum(array.nbytes for array in arrays.values())
+        if size > self.max_size:
+            LOG.debug("Not caching %s: %d bytes exceed the cache size", filename, size)
+            return False
+        write_container(self._entry(filename), meta, arrays)
+        self.evict()
+        return True
+
+    def evict(self):
+        """Removes least recently used entries until within ``max_size``"""
+        with self._lock:
+            entries = sorted(self._entries())
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, path in entries:
+                if size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                size -= entry_size
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry"""
+        with self._lock:
+            for _, _, path in self._entries():
+                os.remove(path)
@@ -1,13 +1,29 @@
+import ast
+import logging
 import sys
+import time
 from pydoc import help
 
-# from qtconsole.manager import QtKernelManager
-import qdarkstyle
+import pyvista
+from PyQt5.QtCore import QTimer, pyqtSignal
 from qtconsole.inprocess import QtInProcessKernelManager
+from qtconsole.manager import QtKernelManager
 from qtconsole.rich_jupyter_widget import RichJupyterWidget
 
+from pyvista_gui.kernel import DATASET_MIMETYPE, load_dataset, write_dataset
+from pyvista_gui.options import rcParams
+from pyvista_gui.utilities import BATCH, dark_stylesheet, get_worker_pool
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
 FROZEN = getattr(sys, "frozen", False)
 
+EXTERNAL_BANNER = (
+    "This console runs in a separate process, the gui variable is not available.\n"
+    "Show a dataset in the viewer with: %push_to_viewer name\n\n"
+)
+
 
 def _complete(self):
     """Performs completion at the current cursor location."""
@@ -24,6 +40,40 @@ def _complete(self):
         pass
 
 
+class _AssignedNames(ast.NodeVisitor):
+    """Collects the names bound in the namespace a cell is executed in"""
+
+    def __init__(self):
+        self.names = []
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Store) and node.id not in self.names:
+            self.names.append(node.id)
+
+    def _skip(self, node):
+        # names bound in nested scopes
+        pass
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = _skip
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _skip
+
+
+def assigned_names(source):
+    """Names a cell of source assigns to at the top level, in order
+
+    Used instead of comparing the whole namespace before and after each
+    cell.  Returns an empty list when ``source`` is not valid Python,
+    such as a cell of IPython magics.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    visitor = _AssignedNames()
+    visitor.visit(tree)
+    return visitor.names
+
+
 # disable completion when frozen
 if FROZEN:
     from qtconsole import frontend_widget
@@ -32,6 +82,31 @@ if FROZEN:
 
 
 class QIPythonWidget(RichJupyterWidget):
+    """Jupyter console running an IPython kernel
+
+    The kernel is started when the console is first shown or first used,
+    rather than on construction, so the main window can be painted
+    first.  Variables pushed and commands executed before the kernel is
+    ready are queued and run once it starts.
+
+    By default the kernel runs in-process and shares its variables with
+    the gui.  When ``rcParams["console_kernel"]`` is ``"external"`` it
+    runs in a separate process instead, see ``pyvista_gui.kernel``.
+    Only datasets can then be pushed to the console, and are written to
+    file on the worker pool first.  Datasets are shown in the viewer with
+    the ``%push_to_viewer`` magic.  As ``gui`` is not available in the
+    console, its banner says so.
+    """
+
+    kernel_started = pyqtSignal(float)
+    # names assigned by each executed cell, in-process kernel only
+    names_assigned = pyqtSignal(list)
+    # variable name and dataset pushed to the viewer, external kernel only
+    dataset_received = pyqtSignal(str, object)
+    # variable name and future of the file of a dataset pushed to an
+    # external kernel.  Emitted from the worker thread
+    _dataset_written = pyqtSignal(str, object)
+
     def __init__(self, parent, custom_banner=None, *args, **kwargs):
         super(QIPythonWidget, self).__init__(*args, **kwargs)
         if custom_banner is not None:
@@ -39,13 +114,15 @@ class QIPythonWidget(RichJupyterWidget):
 
         self.font_size = 8
         self.default_style_sheet = self.styleSheet()
-
-        self.kernel_manager = QtInProcessKernelManager()
-        self.kernel_manager.start_kernel(show_banner=False)
-        self.kernel_manager.kernel.gui = "qt"
-        self.kernel_client = self._kernel_manager.client()
-        self.kernel_client.start_channels()
         self.gui = parent
+        self.external = rcParams["console_kernel"] == "external"
+        self.kernel_start_time = None
+        self._pending_vars = {}
+        self._pending_commands = []
+        self._writes = {}  # name -> future of the latest dataset pushed
+        self._dataset_written.connect(self._load_written_dataset)
+        if self.external:
+            self.banner += EXTERNAL_BANNER
 
         # override "exit" function
         def exit():
@@ -54,9 +131,84 @@ class QIPythonWidget(RichJupyterWidget):
 
         self.push_vars({"gui": parent, "exit": exit, "quit": exit, "help": help})
 
+    @property
+    def kernel_ready(self):
+        return self.kernel_manager is not None
+
+    def start_kernel(self):
+        """Starts the kernel if it is not already running"""
+        if self.kernel_ready:
+            return
+        tstart = time.perf_counter()
+        if self.external:
+            kernel_manager = QtKernelManager()
+            kernel_manager.start_kernel()
+        else:
+            kernel_manager = QtInProcessKernelManager()
+            kernel_manager.start_kernel(show_banner=False)
+            kernel_manager.kernel.gui = "qt"
+        kernel_client = kernel_manager.client()
+        kernel_client.start_channels()
+        self.kernel_manager = kernel_manager
+        self.kernel_client = kernel_client
+        self.kernel_start_time = time.perf_counter() - tstart
+
+        if self.external:
+            self._execute("%load_ext pyvista_gui.kernel", True)
+        else:
+            self.shell.events.register("post_run_cell", self._post_run_cell)
+
+        pending_vars = self._pending_vars
+        self._pending_vars = {}
+        self.push_vars(pending_vars)
+        for command in self._pending_commands:
+            self.execute_command(command)
+        self._pending_commands = []
+        self.kernel_started.emit(self.kernel_start_time)
+
+    def _post_run_cell(self, result):
+        """IPython ``post_run_cell`` callback, run after every cell"""
+        # magics are transformed to Python source
+        names = assigned_names(self.shell.transform_cell(result.info.raw_cell or ""))
+        if names:
+            self.names_assigned.emit(names)
+
+    def showEvent(self, event):
+        super(QIPythonWidget, self).showEvent(event)
+        if not self.kernel_ready:
+            # start after the pending paint events
+            QTimer.singleShot(0, self.start_kernel)
+
+    def shutdown_kernel(self):
+        """Stops a kernel running in a separate process"""
+        if self.external and self.kernel_ready:
+            self.kernel_client.stop_channels()
+            self.kernel_manager.shutdown_kernel()
+
+    def _handle_display_data(self, msg):
+        """Shows the datasets published by ``%push_to_viewer`` in the viewer"""
+        data = msg["content"]["data"]
+        if DATASET_MIMETYPE in data and self.include_output(msg):
+            payload = data.pop(DATASET_MIMETYPE)
+            try:
+                mesh = load_dataset(payload["filename"])
+            except Exception as exception:
+                LOG.error("Unable to load %s: %s", payload["name"], exception)
+            else:
+                self.dataset_received.emit(payload["name"], mesh)
+        super(QIPythonWidget, self)._handle_display_data(msg)
+
     @property
     def variables(self):
-        """Variables local to the qtconsole"""
+        """Variables local to the qtconsole
+
+        Empty for an external kernel, whose variables live in another
+        process.
+        """
+        if not self.kernel_ready:
+            return self._pending_vars
+        if self.external:
+            return {}
         return self.shell.ns_table["user_local"]
 
     def clear_variables(self):
@@ -71,12 +223,18 @@ class QIPythonWidget(RichJupyterWidget):
 
     @property
     def shell(self):
-        """Return shell object"""
+        """Return shell object, ``None`` for an external kernel"""
+        self.start_kernel()
+        if self.external:
+            return None
         return self.kernel_manager.kernel.shell
 
     def enable_dark_mode(self, state):
-        if state:
-            self.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
+        """Sets the style sheet of the console when it is a top level window.
+        Embedded consoles inherit the style sheet of their window.
+        """
+        if state and self.isWindow():
+            self.setStyleSheet(dark_stylesheet())
         else:
             self.setStyleSheet(self.default_style_sheet)
 
@@ -84,7 +242,36 @@ class QIPythonWidget(RichJupyterWidget):
         """Given a dictionary containing name / value pairs, push those
         variables to the Jupyter console widget.
         """
-        self.shell.push(variables)
+        if not self.kernel_ready:
+            self._pending_vars.update(variables)
+            return
+        if not self.external:
+            self.shell.push(variables)
+            return
+
+        # datasets are written to file on the worker pool and
+        # memory-mapped by the kernel once written
+        for name, value in variables.items():
+            if not isinstance(value, (pyvista.DataSet, pyvista.MultiBlock)):
+                LOG.debug("Unable to push %s to an external kernel", name)
+                continue
+            future = get_worker_pool().submit(write_dataset, value, name, _priority=BATCH)
+            self._writes[name] = future
+            future.add_done_callback(
+                lambda future, name=name: self._dataset_written.emit(name, future)
+            )
+
+    def _load_written_dataset(self, name, future):
+        """Loads a dataset pushed to an external kernel.  Run on the GUI thread"""
+        if self._writes.get(name) is not future:
+            # pushed again while being written
+            return
+        del self._writes[name]
+        if future.exception() is not None:
+            LOG.error("Unable to push %s to the console: %s", name, future.exception())
+            return
+        source = "import pyvista_gui.kernel\n%s = pyvista_gui.kernel.load_dataset(%r)"
+        self._execute(source % (name, future.result()), True)
 
     def clear(self):
         """Clear the terminal"""
@@ -92,6 +279,9 @@ class QIPythonWidget(RichJupyterWidget):
 
     def execute_command(self, command):
         """Execute a command in the frame of the console widget"""
+        if not self.kernel_ready:
+            self._pending_commands.append(command)
+            return
         self._execute(command, False)
 
     def _execute(self, source, hidden):
@@ -103,7 +293,9 @@ class QIPythonWidget(RichJupyterWidget):
         #     self.gui.data.store_command(source)
         #     self.gui.save_commands = False
 
+        self.start_kernel()
         super(QIPythonWidget, self)._execute(source, hidden)
 
-        if self.gui:
+        # a script holding the gui decides what is recorded until it is done
+        if self.gui and not self.gui.hold:
             self.gui.save_commands = True
@@ -1 +1,2 @@
 PY_FILE_FILTER = ["Python Script (*.py)"]
+SESSION_FILE_FILTER = ["PyVista GUI Session (*.pvgui)"]
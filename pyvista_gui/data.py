@@ -1,9 +1,12 @@
 """pyvista_gui data module"""
 
+import glob
 import logging
 import os
+from pathlib import PurePath
 
 import pyvista
+from PyQt5.QtCore import QEventLoop
 
 # from PyQt5.QtWidgets import QInputDialog
 from PyQt5.QtWidgets import (
@@ -31,9 +34,16 @@ from PyQt5.QtWidgets import (
 )
 
 import pyvista_gui
-from pyvista_gui.constants import PY_FILE_FILTER
+from pyvista_gui.cache import MeshCache
+from pyvista_gui.constants import PY_FILE_FILTER, SESSION_FILE_FILTER
 from pyvista_gui.dialogs import FileDialog
-from pyvista_gui.utilities import protected_thread
+from pyvista_gui.journal import CommandJournal, CommandRecord, crashed, sessions
+from pyvista_gui.loader import MeshLoader, StreamingMeshLoader
+from pyvista_gui.mesh import TREE_HEADER, GuiMesh
+from pyvista_gui.options import USER_DATA_PATH, rcParams
+from pyvista_gui.playback import TimeSeriesPlayer
+from pyvista_gui.script import ScriptRunner, uses_gui
+from pyvista_gui.session import read_session, write_session
 
 LOG = logging.getLogger(__name__)
 LOG.setLevel("DEBUG")
@@ -45,8 +55,26 @@ class Data:
     def __init__(self, parent):
         self.parent = parent
         self.meshes = []
-        self.commands = []
+        self.journal = CommandJournal()
+        for directory in sessions(os.path.dirname(self.journal.directory))[1:2]:
+            # replay it with CommandJournal.load
+            if crashed(directory):
+                LOG.warning(
+                    "The previous session did not shut down cleanly, its commands are in %s",
+                    directory,
+                )
+        self.loaders = []
         self.load_script_dlg = None
+        self.script_runner = None
+        self.players = []
+        self._autosave_state = None  # filename, records written, modules imported
+
+        # parsed mesh files, see cache.stats
+        self.cache = None
+        if rcParams["mesh_cache_size"]:
+            self.cache = MeshCache(
+                os.path.join(USER_DATA_PATH, "mesh_cache"), rcParams["mesh_cache_size"] * 1024**2
+            )
 
         # initialize cached commands
         self.reset_stored_commands()
@@ -55,9 +83,30 @@ class Data:
             "Mesh": 0,
         }
 
+    def new_varname(self, kind):
+        """Returns the next unused console variable name for ``kind``
+
+        Names of the meshes shown and of the variables of the console are
+        skipped, so a new mesh never replaces a variable assigned in the
+        console.
+        """
+        taken = {gui_mesh.varname for gui_mesh in self.meshes}
+        variables = self.parent.console.variables
+        while True:
+            varname = "%s%d" % (kind, self.varcount[kind])
+            self.varcount[kind] += 1
+            if varname not in taken and varname not in variables:
+                return varname
+
     def reset_stored_commands(self):
         """resets stored commands"""
-        self.commands = []
+        self.journal.clear()
+        self._autosave_state = None
+
+    @property
+    def commands(self):
+        """Python source of the stored commands"""
+        return self.journal.lines()
 
     def list_commands(self):
         for command in self.commands:
@@ -77,52 +126,336 @@ class Data:
         return self.save_commands_dlg
 
     def _save_commands(self, filename):
-        """Save commands to file"""
-        header = '"""\nAuto-generated script for PyVista-GUI\n'
-        header += "Using pyvista     v%s\n" % pyvista.__version__
-        header += "      pyvista_gui v%s\n" % pyvista_gui.__version__
-        header += '"""\n'
-
-        # determine extra imports
-        import_modules = []
-        test_modules = []
-        for command in self.commands:
-            for module in test_modules:
-                if "%s." % module in command:
-                    if module not in import_modules:
-                        import_modules.append(module)
-
-        for module in import_modules:
-            self.commands.insert(0, "import %s" % module)
+        """Save commands to file
 
+        Records are rendered and written one at a time, and the stored
+        commands are not modified.
+        """
         LOG.info("Writing auto-generated script for PyVista to %s", filename)
-
         with open(filename, "w") as f:
-            f.write(header + "\n")
-            for command in self.commands:
-                if command is not None:
-                    command = command.replace("\\", "/")
-                    f.write(command + "\n")
+            self._write_commands(f, directory=self._script_directory(filename))
+
+    def _script_directory(self, filename):
+        """Directory of the sidecar arrays of a script written to ``filename``
+
+        ``<script>_files`` next to the script, or the journal directory
+        for scripts written there.
+        """
+        filename = os.path.abspath(filename)
+        if os.path.dirname(filename) == os.path.abspath(self.journal.directory):
+            return self.journal.directory
+        return os.path.splitext(filename)[0] + "_files"
+
+    def _write_commands(self, f, start=0, modules=None, directory=None):
+        """Writes the commands from record ``start`` onwards to ``f``
+
+        When ``modules`` is ``None`` the script header and the imports of
+        all records are written first.  Otherwise ``modules`` is the set
+        of modules already imported by the file, and imports are written
+        before the first record needing them.  Returns the updated set.
+
+        Sidecar arrays of the records are copied to ``directory`` and
+        loaded from there, see ``CommandJournal.export_arrays``.
+        """
+        journal = self.journal
+        directory = directory or journal.directory
+        if modules is None:
+            f.write('"""\nAuto-generated script for PyVista-GUI\n')
+            f.write("Using pyvista     v%s\n" % pyvista.__version__)
+            f.write("      pyvista_gui v%s\n" % pyvista_gui.__version__)
+            f.write('"""\n\n')
+            # extra imports are tracked by the journal
+            modules = set(journal.modules)
+            for module in journal.modules:
+                f.write("import %s\n" % module)
+
+        for i in range(start, len(journal)):
+            record = journal[i]
+            for module in record.modules:
+                if module not in modules:
+                    modules.add(module)
+                    f.write("import %s\n" % module)
+            journal.export_arrays(record, directory)
+            f.write(journal.render(record, directory) + "\n")
+        return modules
+
+    def autosave(self, filename=None):
+        """Appends the commands recorded since the last autosave to a script
+
+        The first autosave to ``filename``, and the first after the
+        commands have been reset, writes the whole script.
+
+        Parameters
+        ----------
+        filename : str, optional
+            Script to write.  Defaults to ``autosave.py`` in the journal
+            directory.
+
+        Returns
+        -------
+        int
+            Number of commands written.
+
+        """
+        if filename is None:
+            filename = os.path.join(self.journal.directory, "autosave.py")
+        n_records = len(self.journal)
+        directory = self._script_directory(filename)
+
+        state = self._autosave_state
+        if state is None or state[0] != filename:
+            with open(filename, "w") as f:
+                modules = self._write_commands(f, directory=directory)
+            n_written = n_records
+        else:
+            _, n_saved, modules = state
+            if n_saved == n_records:
+                return 0
+            with open(filename, "a") as f:
+                modules = self._write_commands(f, n_saved, modules, directory)
+            n_written = n_records - n_saved
+
+        self._autosave_state = (filename, n_records, modules)
+        return n_written
 
     def store_command(self, command):
-        """Stores a command"""
-        if command is not None:
-            self.commands.append(command)
+        """Stores a command in the journal
+
+        Parameters
+        ----------
+        command : CommandRecord or str
+            Structured command, or Python source such as a script.
 
-    @protected_thread
-    def load_mesh(self, uinput, name=None, reset_camera=True):
-        """Adds a surface to self"""
-        raise NotImplementedError()
-        # TODO
-        # return GuiSurface(uinput, self.parent, name=name, reset_camera=reset_camera)
+        Returns
+        -------
+        CommandRecord
+            The stored record.
+
+        """
+        if command is None:
+            return
+        if not isinstance(command, CommandRecord):
+            command = CommandRecord(source=command)
+        return self.journal.append(command)
+
+    def load_mesh(self, uinput, name=None, reset_camera=True, stream=False):
+        """Adds a mesh to the gui
+
+        Files are read on a worker thread while a progress dialog is
+        shown, and the mesh is added once the read completes.  A script
+        run statement by statement waits for the mesh before running its
+        next statement, see ``ScriptRunner``, and while a script run as a
+        whole holds the gui (``gui.hold``) this only returns once the
+        mesh has been added.
+
+        With ``stream`` the file is read piece by piece instead, see
+        ``StreamingMeshLoader``.  Each piece or block is added to the
+        plotter as soon as it is read and listed in the object tree under
+        a header named after the file.  A single command reading all the
+        pieces is stored once the whole file has been read, and none when
+        the load is cancelled or fails.
+
+        Parameters
+        ----------
+        uinput : str or pyvista.DataSet
+            Filename or an existing dataset.
+
+        name : str, optional
+            Name displayed in the object tree.
+
+        reset_camera : bool, optional
+            Reset the camera after adding the mesh.
+
+        stream : bool, optional
+            Read and add large parallel or MultiBlock files piece by piece.
+
+        Returns
+        -------
+        pyvista_gui.loader.MeshLoader or pyvista_gui.mesh.GuiMesh
+            The loader when reading from file, otherwise the added mesh.
+
+        """
+        if not isinstance(uinput, str):
+            gui_mesh = self.find_mesh(uinput)
+            if gui_mesh is not None:
+                # already shown, for example when assigned in the console
+                return gui_mesh
+            return self._add_mesh(uinput, name=name, reset_camera=reset_camera)
+        if stream:
+            return self._stream_mesh(uinput, name, reset_camera)
+
+        loader = MeshLoader(uinput, cache=self.cache)
+        if name is None:
+            name = os.path.basename(loader.filename)
+
+        def on_loaded(mesh, filename):
+            self._add_mesh(mesh, filename, name=name, reset_camera=reset_camera)
+
+        loader.loaded.connect(on_loaded)
+        loader.failed.connect(self.parent.errorsignal)
+        loader.cancelled.connect(lambda filename: LOG.info("Cancelled loading %s", filename))
+        loader.finished.connect(lambda: self._loader_finished(loader))
+
+        self.loaders.append(loader)
+        self.parent.open_progress_dialog("Loading %s" % name, loader.cancel, loader.progress)
+        self._start_loader(loader)
+        return loader
+
+    def _stream_mesh(self, filename, header=None, reset_camera=True):
+        """Adds the pieces of a file as they are read, see ``load_mesh``"""
+        loader = StreamingMeshLoader(filename)
+        if header is None:
+            header = os.path.basename(loader.filename)
+
+        added = []
+        completed = True
+
+        def on_piece_loaded(piece, name, piece_filename):
+            # the camera is reset to the first piece and to all of them at the end
+            gui_mesh = self._add_mesh(
+                piece, name=name, reset_camera=reset_camera and not added, header=header
+            )
+            added.append(gui_mesh)
+
+        def on_stopped(*args):
+            nonlocal completed
+            completed = False
+
+        def on_finished():
+            if reset_camera and len(added) > 1:
+                self.parent.plotter.reset_camera()
+            if completed and added:
+                # the pieces are assigned to the variables of their meshes
+                assign = ", ".join(gui_mesh.varname for gui_mesh in added) + ","
+                record = CommandRecord(
+                    "pyvista_gui.loader", "read_pieces", [PurePath(loader.filename)], assign=assign
+                )
+                added[-1].store_command(record)
+            self._loader_finished(loader)
+
+        loader.piece_loaded.connect(on_piece_loaded)
+        loader.failed.connect(self.parent.errorsignal)
+        loader.failed.connect(on_stopped)
+        loader.cancelled.connect(lambda filename: LOG.info("Cancelled loading %s", filename))
+        loader.cancelled.connect(on_stopped)
+        loader.finished.connect(on_finished)
+
+        self.loaders.append(loader)
+        self.parent.open_progress_dialog("Loading %s" % header, loader.cancel, loader.progress)
+        self._start_loader(loader)
+        return loader
+
+    def _start_loader(self, loader):
+        """Starts a loader, waiting for it while a whole script holds the gui"""
+        runner = self.script_runner
+        if not self.parent.hold or (runner is not None and runner.running):
+            loader.start()
+            return
+        # the following lines of the script may use the mesh
+        loop = QEventLoop()
+        loader.finished.connect(loop.quit)
+        loader.start()
+        loop.exec_()
+
+    def _loader_finished(self, loader):
+        """Release a completed loader and close its progress dialog"""
+        if loader in self.loaders:
+            self.loaders.remove(loader)
+        self.parent.closepbar_signal.emit()
+        if not self.loaders and self.script_runner is not None:
+            self.script_runner.loads_finished()
+
+    def _add_mesh(self, mesh, filename=None, name=None, reset_camera=True, header=TREE_HEADER):
+        """Adds a loaded dataset to the gui.  Must be run on the GUI thread"""
+        gui_mesh = GuiMesh(mesh, self.parent, name=name, reset_camera=reset_camera, header=header)
+        if filename is not None:
+            record = CommandRecord("pyvista", "read", [PurePath(filename)], assign=gui_mesh.varname)
+            gui_mesh.store_command(record)
+        LOG.debug("Added %s", gui_mesh)
+        return gui_mesh
+
+    def find_mesh(self, dataset):
+        """Returns the ``GuiMesh`` displaying ``dataset`` or ``None``"""
+        for gui_mesh in self.meshes:
+            if gui_mesh.mesh is dataset:
+                return gui_mesh
+
+    def add_console_variables(self, names):
+        """Shows datasets assigned to ``names`` in the console
+
+        Connected to ``QIPythonWidget.names_assigned``, so only the names
+        assigned by the last executed cell are looked up.  Datasets are
+        added by reference under their console variable name.  When a
+        variable shown this way is assigned a new dataset, the new
+        dataset replaces the old one.
+        """
+        if not rcParams["watch_console"]:
+            return
+        variables = self.parent.console.variables
+        shown = {id(gui_mesh.mesh) for gui_mesh in self.meshes}
+        for name in names:
+            value = variables.get(name)
+            if isinstance(value, (pyvista.DataSet, pyvista.MultiBlock)) and id(value) not in shown:
+                self.add_console_dataset(name, value)
+                shown.add(id(value))
+
+    def add_console_dataset(self, varname, dataset):
+        """Shows a dataset held by console variable ``varname``
+
+        Replaces the dataset previously shown for ``varname``.  Connected
+        to ``QIPythonWidget.dataset_received`` for datasets pushed from an
+        external kernel.
+        """
+        for gui_mesh in self.meshes:
+            if gui_mesh.varname == varname:
+                gui_mesh.remove()
+                break
+        gui_mesh = GuiMesh(dataset, self.parent, reset_camera=not self.meshes, varname=varname)
+        LOG.debug("Added %s from the console", gui_mesh)
+        self.parent.trigger_render.emit()
+        return gui_mesh
+
+    def cancel_loading(self):
+        """Cancels all meshes currently being loaded"""
+        for loader in list(self.loaders):
+            loader.cancel()
+
+    def load_time_series(self, filenames, name=None):
+        """Adds a time series and shows its playback controls
+
+        Parameters
+        ----------
+        filenames : str or list of str
+            File of each time step in order, or a glob pattern matching
+            them, sorted by name.
+
+        name : str, optional
+            Name displayed in the object tree.
+
+        Returns
+        -------
+        pyvista_gui.playback.TimeSeriesPlayer
+
+        """
+        if isinstance(filenames, str):
+            filenames = sorted(glob.glob(os.path.expanduser(filenames)))
+        player = TimeSeriesPlayer(self.parent, filenames, name=name)
+        self.players.append(player)
+        self.parent.show_playback(player)
+        return player
 
     def remove(self, item):
         """Removes an item from the database"""
         if item in self.meshes:
             self.meshes.remove(item)
+        for player in list(self.players):
+            if player.gui_mesh is item:
+                player.close()
+                self.players.remove(player)
 
     def reset(self):
         """removes all items from database"""
+        self.cancel_loading()
         for item in self.items:
             item.remove()
 
@@ -130,25 +463,109 @@ class Data:
         self.reset_stored_commands()
         if hasattr(self.parent.plotter, "reset"):
             self.parent.plotter.reset()
-        self.parent.textedit_commands.clear()
+        self.parent.command_history.clear()
 
         # clear gui widgets
         self.parent.textbox_logger.widget.clear()
         self.parent.console.clear()
 
-    # def save(self, filename):  # pragma: no cover
-    #     """ save all data """
-    #     with zipfile.ZipFile(filename, 'w') as zipfile:
-    #         for item in self.items:
-    #             item.write_to_zip(zipfile)
+    def save(self, filename):
+        """Saves all meshes and the view to a session file
+
+        See ``pyvista_gui.session`` for the file format.  Returns ``False``
+        and shows an error when the session can not be written.
+        """
+        plotter = self.parent.plotter
+        state = {
+            "camera_position": [list(vector) for vector in plotter.camera_position],
+            "background": list(plotter.renderer.GetBackground()),
+            "expanded": self.parent.tree.expanded_headers(),
+        }
+        meshes = [(mesh.name, mesh.mesh) for mesh in self.meshes]
+        LOG.info("Saving session with %d meshes to %s", len(meshes), filename)
+        try:
+            write_session(filename, meshes, state)
+        except Exception as exception:
+            LOG.error("Unable to save session to %s: %s", filename, exception)
+            self.parent.show_error("Unable to save session", str(exception))
+            return False
+        return True
+
+    def load_session(self, filename):
+        """Replaces all data with a session saved with ``save``
+
+        Mesh arrays are memory-mapped from the session file rather than
+        read into memory.  Returns ``False`` and shows an error, keeping
+        the current data, when the file can not be read.
+        """
+        try:
+            meshes, state = read_session(filename)
+        except Exception as exception:
+            LOG.error("Unable to load session %s: %s", filename, exception)
+            self.parent.show_error("Unable to load session", str(exception))
+            return False
+        self.reset()
+        for i, (name, mesh) in enumerate(meshes):
+            gui_mesh = GuiMesh(mesh, self.parent, name=name, reset_camera=False)
+            record = CommandRecord(
+                "pyvista_gui.session",
+                "read_session_mesh",
+                [PurePath(filename), i],
+                assign=gui_mesh.varname,
+            )
+            gui_mesh.store_command(record)
+
+        plotter = self.parent.plotter
+        if "camera_position" in state:
+            plotter.camera_position = [tuple(vector) for vector in state["camera_position"]]
+        if "background" in state:
+            plotter.set_background(state["background"])
+        self.parent.tree.expand_headers(state.get("expanded", []))
+        self.parent.trigger_render.emit()
+        return True
+
+    def save_session_dialog(self):
+        """Open up a file dialog to save the session"""
+        self.save_session_dlg = FileDialog(
+            self.parent, SESSION_FILE_FILTER, save_mode=True, callback=self.save
+        )
+        return self.save_session_dlg
+
+    def load_session_dialog(self):
+        """Open up a file dialog to load a session"""
+        self.load_session_dlg = FileDialog(
+            self.parent, SESSION_FILE_FILTER, callback=self.load_session
+        )
+        return self.load_session_dlg
 
     def load_script_dialog(self):
         """Open up a file dialog to load a Python script"""
         self.load_script_dlg = FileDialog(self.parent, PY_FILE_FILTER, callback=self.load_script)
         return self.load_script_dlg
 
-    def load_script(self, filename):
-        """Run a Python script from the qtconsole"""
+    def load_script(self, filename, stepwise=True):
+        """Run a Python script from the qtconsole
+
+        By default the script is run one top-level statement at a time,
+        see ``ScriptRunner``, while a progress dialog allowing the script
+        to be cancelled is shown.  Each statement is stored as a command
+        once it has executed.
+
+        Parameters
+        ----------
+        filename : str
+            Python script.
+
+        stepwise : bool, optional
+            Run the script statement by statement.  When ``False`` the
+            script is run as a single console execution and stored whole.
+
+        Returns
+        -------
+        pyvista_gui.script.ScriptRunner
+            The runner when running statement by statement.
+
+        """
         if not os.path.isfile(filename):
             err_str = (
                 'Unable to find python script file "%s"\n' % str(filename)
@@ -159,22 +576,59 @@ class Data:
             self.parent.show_error(err_str)
             return
 
-        # execute script and don't save internal commands
-        self.parent.save_commands = False
-        self.parent.hold = True
-
-        # set hold parameter to False when complete to let main know
-        # the script is complete
-        command = 'exec(open("%s").read()); gui.hold = False' % filename
-        command += ";gui.save_commands = True"
-        self.parent.console.execute(command)
-
         with open(filename) as f:
             text = f.read()
-        self.store_command(text)
 
-        note = "# commands from %s" % filename
-        self.parent.textedit_commands.add_command(note)
-        self.parent.textedit_commands.add_command(text)
-        note = "# finished with commands from %s" % filename
-        self.parent.textedit_commands.add_command(note)
+        if not stepwise:
+            # execute script and don't save internal commands
+            self.parent.save_commands = False
+            self.parent.hold = True
+
+            # set hold parameter to False when complete to let main know
+            # the script is complete
+            command = 'exec(open("%s").read()); gui.hold = False' % filename
+            command += ";gui.save_commands = True"
+            self.parent.console.execute(command)
+
+            self.store_command(text)
+            note = "# commands from %s" % filename
+            self.parent.command_history.add_command(note)
+            self.parent.command_history.add_command(text)
+            note = "# finished with commands from %s" % filename
+            self.parent.command_history.add_command(note)
+            return
+
+        if self.script_runner is not None and self.script_runner.running:
+            self.parent.show_error("A script is already running")
+            return
+        try:
+            runner = ScriptRunner(self.parent, text, filename)
+        except SyntaxError as exception:
+            LOG.error(exception)
+            self.parent.show_error("Unable to run script", str(exception))
+            return
+
+        def on_statement_done(index, statement):
+            if uses_gui(statement):
+                # the gui recorded the commands it ran for the statement
+                return
+            record = self.store_command(statement)
+            self.parent.command_history.add_command(self.journal.render(record))
+
+        def on_finished(completed):
+            if completed:
+                note = "# finished with commands from %s" % filename
+            else:
+                note = "# stopped running commands from %s" % filename
+            self.parent.command_history.add_command(note)
+            self.parent.closepbar_signal.emit()
+
+        self.parent.command_history.add_command("# commands from %s" % filename)
+        runner.statement_done.connect(on_statement_done)
+        runner.finished.connect(on_finished)
+        self.script_runner = runner
+        self.parent.open_progress_dialog(
+            "Running %s" % os.path.basename(filename), runner.cancel, runner.progress
+        )
+        runner.start()
+        return runner
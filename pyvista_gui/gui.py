@@ -2,9 +2,11 @@
 
 import datetime
 import logging
+import os
+import time
+from collections import OrderedDict
 
-import qdarkstyle
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 
 # from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import (
@@ -17,6 +19,7 @@ from PyQt5.QtWidgets import (
     QProgressDialog,
     QSizePolicy,
     QSplitter,
+    QTreeView,
     QVBoxLayout,
 )
 from pyvista.plotting import Plotter
@@ -25,8 +28,14 @@ from pyvistaqt import QtInteractor
 from pyvista_gui.console import QIPythonWidget
 from pyvista_gui.data import Data
 from pyvista_gui.dialogs import ColorDialog, LoadMeshDialog
+from pyvista_gui.lod import LODManager
+from pyvista_gui.models import MultiBlockModel
 from pyvista_gui.options import rcParams
-from pyvista_gui.widgets import QTextEditCommands, QTextEditLogger, TreeWidget
+from pyvista_gui.perf import PerfMonitor, PerformanceWidget
+from pyvista_gui.playback import PlaybackWidget
+from pyvista_gui.render import RenderScheduler
+from pyvista_gui.utilities import dark_stylesheet
+from pyvista_gui.widgets import CommandHistoryWidget, QTextEditLogger, TreeWidget
 
 # from weakref import proxy
 # from functools import wraps
@@ -69,12 +78,18 @@ class GUIWindow(QMainWindow):
         """Generate window and initialize a scene"""
         QMainWindow.__init__(self, parent)
         LOG.debug("Initializing GUI...")
+        self.startup_times = OrderedDict()
+        tstart = time.perf_counter()
         self.app = app
         self.default_style_sheet = self.styleSheet()
+        self.dark_mode = None
         self.save_commands = True  # stores commands internally when True
         self.hold = False
         self.off_screen_vtk = off_screen_vtk
         self.load_dialog = None
+        self.pbar = None
+        self.dock_blocks = None
+        self.dock_playback = None
 
         self.resize(800, 600)
         self.setWindowTitle("PyVista GUI")
@@ -89,11 +104,17 @@ class GUIWindow(QMainWindow):
         self.dock_console = QDockWidget("Console", self)
         self.dock_console.setWidget(self.console)
         self.addDockWidget(Qt.BottomDockWidgetArea, self.dock_console)
+        self.console.kernel_started.connect(self._kernel_started)
+        self.console.names_assigned.connect(self.data.add_console_variables)
+        self.console.dataset_received.connect(self.data.add_console_dataset)
+        tstart = self._record_startup("console", tstart)
 
         # commands
-        self.textedit_commands = QTextEditCommands(self)
+        self.command_history = CommandHistoryWidget(
+            self, os.path.join(self.data.journal.directory, "history.jsonl")
+        )
         self.dock_commands = QDockWidget("Commands", self)
-        self.dock_commands.setWidget(self.textedit_commands)
+        self.dock_commands.setWidget(self.command_history)
         # self.addDockWidget(Qt.BottomDockWidgetArea, self.dock_commands)
 
         # object tree
@@ -111,6 +132,7 @@ class GUIWindow(QMainWindow):
         self.dock_logger = QDockWidget("Log", self)
         self.dock_logger.setWidget(self.textbox_logger.widget)
         # self.addDockWidget(Qt.BottomDockWidgetArea, self.dock_logger)
+        tstart = self._record_startup("docks", tstart)
 
         # vtk frame if available
         if off_screen_vtk:
@@ -128,25 +150,73 @@ class GUIWindow(QMainWindow):
             self.resizeDocks([self.dock_vtk, self.dock_tree], [4, 1], Qt.Horizontal)
 
             # self.plotter.add_toolbars(self)
+        # large meshes are swapped for proxies while the camera moves
+        self.lod = LODManager(self.plotter, self)
+        tstart = self._record_startup("plotter", tstart)
+
+        # render times and memory, also available from the console as gui.perf
+        self.perf = PerfMonitor(self, self)
+        self.dock_perf = QDockWidget("Performance", self)
+        self.dock_perf.setWidget(PerformanceWidget(self.perf, self))
 
         self.tabifyDockWidget(self.dock_console, self.dock_commands)
         self.tabifyDockWidget(self.dock_commands, self.dock_logger)
+        self.tabifyDockWidget(self.dock_logger, self.dock_perf)
         self.dock_console.raise_()
 
         # Create menu
         self.make_menu()
+        tstart = self._record_startup("menu", tstart)
+
+        # renders requested through trigger_render are merged per frame
+        self.render_scheduler = RenderScheduler(self.plotter.render, rcParams["max_fps"], self)
 
         # connects
-        self.trigger_render.connect(self.plotter.render)
+        self.trigger_render.connect(self.render_scheduler.request)
         self.errorsignal.connect(self.error_dialog)
         self.closepbar_signal.connect(self._closepbar)
+
+        # periodically append new commands to the autosave script
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.data.autosave)
+        if rcParams["autosave_interval"]:
+            self.autosave_timer.start(int(rcParams["autosave_interval"] * 1000))
         LOG.debug("GUI initialized")
 
         # Show frame
         self.enable_dark_mode(rcParams["dark_mode"])
+        tstart = self._record_startup("stylesheet", tstart)
 
         if show:
             self.show()
+            self._record_startup("show", tstart)
+
+    def _record_startup(self, phase, tstart):
+        """Records the time spent in a startup phase and returns the current time"""
+        now = time.perf_counter()
+        self.startup_times[phase] = now - tstart
+        return now
+
+    def _kernel_started(self, elapsed):
+        self.startup_times["kernel"] = elapsed
+        LOG.debug("Startup times:\n%s", self.startup_report())
+
+    def startup_report(self):
+        """Breakdown of the time spent constructing the gui"""
+        lines = ["%-12s %8.1f ms" % (phase, t * 1000) for phase, t in self.startup_times.items()]
+        if "kernel" not in self.startup_times:
+            lines.append("%-12s  pending" % "kernel")
+        total = sum(self.startup_times.values())
+        lines.append("%-12s %8.1f ms" % ("total", total * 1000))
+        return "\n".join(lines)
+
+    def closeEvent(self, event):
+        self.console.shutdown_kernel()
+        # the handler's widget is deleted with the window
+        logging.getLogger().removeHandler(self.textbox_logger)
+        self.textbox_logger.close()
+        self.data.journal.close()
+        super(GUIWindow, self).closeEvent(event)
 
     def make_menu(self):
         """Generates menus"""
@@ -154,7 +224,7 @@ class GUIWindow(QMainWindow):
         self.menu.setNativeMenuBar(False)
 
         # main menu
-        # self.file_menu = self._build_file_menu()
+        self.file_menu = self._build_file_menu()
         self.view_menu = self._build_view_menu()
         # self.panels_menu = self._build_panels_menu()
         # self.help_menu = self._build_help_menu()
@@ -170,9 +240,62 @@ class GUIWindow(QMainWindow):
         self.err_message_box.setWindowTitle("Error")
         self.err_message_box.show()
 
+    def show_error(self, exception, textinfo=""):
+        """Shows an error dialog.  Safe to call from any thread"""
+        self.errorsignal.emit(str(exception), textinfo)
+
+    def open_progress_dialog(self, text, cancel_callback=None, progress_signal=None):
+        """Opens a modeless progress dialog
+
+        Parameters
+        ----------
+        text : str
+            Label shown in the dialog.
+
+        cancel_callback : callable, optional
+            Called when the user presses cancel.
+
+        progress_signal : pyqtSignal, optional
+            Signal emitting an integer percentage used to update the dialog.
+
+        """
+        if self.off_screen_vtk:
+            return
+        self._closepbar()
+        self.pbar = QProgressDialog(text, "Cancel", 0, 100, self)
+        self.pbar.setWindowTitle("Please Wait")
+        self.pbar.setWindowModality(Qt.NonModal)
+        self.pbar.setMinimumDuration(500)
+        self.pbar.setAutoClose(False)
+        self.pbar.setValue(0)
+        if cancel_callback is not None:
+            self.pbar.canceled.connect(cancel_callback)
+        if progress_signal is not None:
+            progress_signal.connect(self.pbar.setValue)
+        return self.pbar
+
     def _closepbar(self):
         """Only to be accessed by a signal call"""
-        self.pbar.signal_close()
+        if self.pbar is not None:
+            # closing a progress dialog emits canceled
+            try:
+                self.pbar.canceled.disconnect()
+            except TypeError:
+                pass
+            self.pbar.close()
+            self.pbar.deleteLater()
+            self.pbar = None
+
+    def _build_file_menu(self):
+        """Creates file menu"""
+        menu = self.menu.addMenu("File")
+        self.add_menu_item(menu, "Load Mesh...", self.load_mesh)
+        self.add_menu_item(menu, "Load Script...", self.data.load_script_dialog, addsep=True)
+        self.add_menu_item(menu, "Save Commands...", self.data.save_commands_dialog)
+        self.add_menu_item(menu, "Load Session...", self.data.load_session_dialog, addsep=True)
+        self.add_menu_item(menu, "Save Session...", self.data.save_session_dialog)
+        self.add_menu_item(menu, "Exit", self.close, addsep=True)
+        return menu
 
     def _build_view_menu(self):
         """Creates view menu"""
@@ -205,18 +328,25 @@ class GUIWindow(QMainWindow):
 
         self.action_dark_mode = QAction("Dark Mode", menu, checkable=True)
         self.action_dark_mode.setChecked(rcParams["dark_mode"])
-        self.enable_dark_mode(rcParams["dark_mode"])
         self.action_dark_mode.triggered.connect(self.enable_dark_mode)
         menu.addAction(self.action_dark_mode)
 
         self.view_menu = menu
 
     def enable_dark_mode(self, state=True):
-        """sets style sheet to dark mode"""
+        """sets style sheet to dark mode
+
+        The style sheet is only applied to the main window, from which
+        it cascades to all docks, and only when the mode changes.
+        """
+        state = bool(state)
+        if state == self.dark_mode:
+            return
         if state:
-            self.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
+            self.setStyleSheet(dark_stylesheet())
         else:
             self.setStyleSheet(self.default_style_sheet)
+        self.dark_mode = state
         self.console.enable_dark_mode(state)
         rcParams["dark_mode"] = state
 
@@ -225,6 +355,49 @@ class GUIWindow(QMainWindow):
             self.action_dark_mode.setChecked(state)
             self.action_dark_mode.blockSignals(False)
 
+    def show_blocks(self, gui_mesh):
+        """Shows the block hierarchy of a MultiBlock mesh in a dock"""
+        if self.dock_blocks is None:
+            view = QTreeView(self)
+            view.setUniformRowHeights(True)
+            self.dock_blocks = QDockWidget("Blocks", self)
+            self.dock_blocks.setWidget(view)
+            self.addDockWidget(Qt.LeftDockWidgetArea, self.dock_blocks)
+            self.tabifyDockWidget(self.dock_tree, self.dock_blocks)
+
+        view = self.dock_blocks.widget()
+        self._set_blocks_model(MultiBlockModel(gui_mesh.mesh, gui_mesh.name, view))
+        view.expandToDepth(0)
+        self.dock_blocks.show()
+        self.dock_blocks.raise_()
+
+    def clear_blocks(self, multiblock=None):
+        """Empties the Blocks dock, only when it shows ``multiblock`` if given"""
+        if self.dock_blocks is None:
+            return
+        model = self.dock_blocks.widget().model()
+        if model is not None and (multiblock is None or model.multiblock is multiblock):
+            self._set_blocks_model(None)
+
+    def _set_blocks_model(self, model):
+        # the previous model references its MultiBlock until deleted
+        view = self.dock_blocks.widget()
+        previous = view.model()
+        view.setModel(model)
+        if previous is not None:
+            previous.deleteLater()
+
+    def show_playback(self, player):
+        """Shows the playback controls of a time series in a dock"""
+        if self.dock_playback is None:
+            self.dock_playback = QDockWidget("Playback", self)
+            self.addDockWidget(Qt.BottomDockWidgetArea, self.dock_playback)
+        else:
+            self.dock_playback.widget().deleteLater()
+        self.dock_playback.setWidget(PlaybackWidget(player, self))
+        self.dock_playback.show()
+        self.dock_playback.raise_()
+
     def change_background(self):
         """Pulls up change background dialog"""
         self.color_dlg = ColorDialog(self)
@@ -253,4 +426,8 @@ class GUIWindow(QMainWindow):
 
     def load_mesh(self):
         """Loads a mesh from file using a file dialog"""
-        self.file_dialog = LoadMeshDialog(self, callback=self.data.load_meesh)
+        self.file_dialog = LoadMeshDialog(self, callback=self._load_mesh_accepted)
+
+    def _load_mesh_accepted(self, filename, is_rotor):
+        """Starts loading the mesh selected in the load mesh dialog"""
+        self.data.load_mesh(filename)
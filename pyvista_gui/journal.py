@@ -0,0 +1,311 @@
+"""Structured, replayable journal of the commands run by the gui"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+# arrays with more elements than this are written to a sidecar .npy file
+INLINE_ARRAY_SIZE = 16
+
+# record targets that are modules rather than variables
+MODULES = ("numpy", "pyvista", "pyvista_gui.loader", "pyvista_gui.session")
+
+JOURNAL_FILENAME = "journal.jsonl"
+ARRAY_DIRECTORY = "arrays"
+# written when the journal is closed at a clean shutdown
+CLOSED_FILENAME = "closed"
+
+# journals of past sessions kept in the journal root
+MAX_SESSIONS = 10
+
+
+def sessions(root):
+    """Journal directories of the sessions in ``root``, latest first"""
+    if not os.path.isdir(root):
+        return []
+    names = sorted(os.listdir(root), reverse=True)
+    return [os.path.join(root, name) for name in names if os.path.isdir(os.path.join(root, name))]
+
+
+def new_session(root):
+    """Creates the journal directory of a new session in ``root``
+
+    Directories are named after the time their session started, so the
+    journal of a session that crashed can be found with ``sessions`` by
+    the next one.  Only the latest ``MAX_SESSIONS`` are kept.
+    """
+    os.makedirs(root, exist_ok=True)
+    for directory in sessions(root)[MAX_SESSIONS - 1 :]:
+        shutil.rmtree(directory, ignore_errors=True)
+    return tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=root)
+
+
+def crashed(directory):
+    """True when the session of a journal recorded commands but did not close it"""
+    filename = os.path.join(directory, JOURNAL_FILENAME)
+    return (
+        os.path.isfile(filename)
+        and os.path.getsize(filename) > 0
+        and not os.path.exists(os.path.join(directory, CLOSED_FILENAME))
+    )
+
+
+def array_paths(value):
+    """Sidecar array paths referenced by an encoded argument"""
+    if isinstance(value, dict):
+        return [value["npy"]] if "npy" in value else []
+    if isinstance(value, list):
+        return [path for item in value for path in array_paths(item)]
+    return []
+
+
+class CommandRecord(object):
+    """A single command: ``assign = target.method(*args, **kwargs)``
+
+    Records holding raw Python source, such as scripts run from the gui,
+    have ``source`` set instead.
+
+    Parameters
+    ----------
+    target : str
+        Variable or module name the method is called on.
+
+    method : str
+        Name of the method.
+
+    args : list, optional
+        Positional arguments.
+
+    kwargs : dict, optional
+        Keyword arguments.
+
+    assign : str, optional
+        Variable the result is assigned to.
+
+    source : str, optional
+        Python source of the command when it is not a method call.
+
+    """
+
+    __slots__ = ["target", "method", "args", "kwargs", "assign", "source"]
+
+    def __init__(self, target=None, method=None, args=(), kwargs=None, assign=None, source=None):
+        self.target = target
+        self.method = method
+        self.args = list(args)
+        self.kwargs = dict(kwargs or {})
+        self.assign = assign
+        self.source = source
+
+    def __repr__(self):
+        return "CommandRecord(%r)" % self.render()
+
+    @property
+    def modules(self):
+        """Modules that must be imported to replay this record"""
+        modules = []
+        if self.target in MODULES:
+            modules.append(self.target)
+        for value in self.args + list(self.kwargs.values()):
+            if isinstance(value, dict) and ("npy" in value or "dtype" in value):
+                modules.append("numpy")
+                break
+        return modules
+
+    def to_json(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(**data)
+
+    def render(self, directory=""):
+        """Python source of this record
+
+        ``directory`` is the journal directory that sidecar array paths
+        are relative to.
+        """
+        if self.source is not None:
+            return self.source
+        args = [render_value(arg, directory) for arg in self.args]
+        for key, value in self.kwargs.items():
+            args.append("%s=%s" % (key, render_value(value, directory)))
+        command = "%s.%s(%s)" % (self.target, self.method, ", ".join(args))
+        if self.assign:
+            command = "%s = %s" % (self.assign, command)
+        return command
+
+
+def render_value(value, directory=""):
+    """Python source of an encoded argument"""
+    if isinstance(value, dict):
+        if "var" in value:
+            return value["var"]
+        if "npy" in value:
+            path = os.path.join(directory, value["npy"]).replace("\\", "/")
+            return "numpy.load(%r)" % path
+        if "dtype" in value:
+            return 'numpy.array(%r, dtype="%s")' % (value["array"], value["dtype"])
+        if "repr" in value:
+            return value["repr"]
+        if "path" in value:
+            # scripts saved on Windows replay elsewhere
+            return repr(value["path"].replace("\\", "/"))
+    if isinstance(value, list):
+        return "[%s]" % ", ".join(render_value(item, directory) for item in value)
+    if isinstance(value, os.PathLike):
+        return repr(os.fspath(value).replace("\\", "/"))
+    return repr(value)
+
+
+class CommandJournal(object):
+    """Ordered journal of ``CommandRecord`` appended to disk as JSON lines
+
+    Each append writes one line to ``journal.jsonl`` in ``directory``.
+    Arrays larger than ``INLINE_ARRAY_SIZE`` are written once to
+    ``arrays/*.npy`` and referenced from the record by path, so records
+    stay small however large their arguments are.  Records may be
+    appended from any thread.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Directory of the journal.  Defaults to a new session directory in
+        ``journal`` of the pyvista user data path, see ``new_session``.
+
+    """
+
+    def __init__(self, directory=None):
+        if directory is None:
+            from pyvista_gui.options import USER_DATA_PATH
+
+            directory = new_session(os.path.join(USER_DATA_PATH, "journal"))
+        self.directory = directory
+        self.records = []
+        self.modules = {}  # ordered set of modules used by the records
+        self._file = None
+        self._n_arrays = 0
+        self._lock = threading.Lock()
+
+    @property
+    def filename(self):
+        return os.path.join(self.directory, JOURNAL_FILENAME)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def _encode(self, value):
+        """JSON serializable form of an argument"""
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, os.PathLike):
+            return {"path": os.fspath(value)}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            if value.size <= INLINE_ARRAY_SIZE:
+                return {"array": value.tolist(), "dtype": value.dtype.str}
+            return {"npy": self._store_array(value)}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        if hasattr(value, "varname"):
+            return {"var": value.varname}
+        return {"repr": repr(value)}
+
+    def _store_array(self, array):
+        """Writes an array to a sidecar file and returns its relative path"""
+        path = os.path.join(ARRAY_DIRECTORY, "%06d.npy" % self._n_arrays)
+        self._n_arrays += 1
+        os.makedirs(os.path.join(self.directory, ARRAY_DIRECTORY), exist_ok=True)
+        np.save(os.path.join(self.directory, path), array)
+        return path
+
+    def append(self, record):
+        """Encodes the arguments of ``record`` and appends it to the journal"""
+        with self._lock:
+            record.args = [self._encode(arg) for arg in record.args]
+            record.kwargs = {key: self._encode(value) for key, value in record.kwargs.items()}
+            self.records.append(record)
+            for module in record.modules:
+                self.modules[module] = None
+
+            if self._file is None:
+                self._file = open(self.filename, "a")
+            self._file.write(json.dumps(record.to_json()) + "\n")
+            self._file.flush()
+        return record
+
+    def render(self, record, directory=None):
+        """Python source of a record of this journal
+
+        ``directory`` is where its sidecar arrays are loaded from,
+        defaulting to the journal directory, see ``export_arrays``.
+        """
+        return record.render(directory or self.directory)
+
+    def export_arrays(self, record, directory):
+        """Copies the sidecar arrays of a record to ``directory``
+
+        Scripts saved outside the journal directory keep their arrays
+        next to them, so they still run once the journal is removed.
+        """
+        if os.path.abspath(directory) == os.path.abspath(self.directory):
+            return
+        for path in array_paths(record.args + list(record.kwargs.values())):
+            target = os.path.join(directory, path)
+            if not os.path.isfile(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(self.directory, path), target)
+
+    def lines(self):
+        """Python source of every record"""
+        return [record.render(self.directory) for record in self.records]
+
+    def clear(self):
+        """Removes all records, truncating the journal file"""
+        with self._lock:
+            self._close()
+            self.records = []
+            self.modules = {}
+            open(self.filename, "w").close()
+
+    def close(self):
+        """Closes the journal file and marks the session as shut down cleanly"""
+        with self._lock:
+            self._close()
+            open(os.path.join(self.directory, CLOSED_FILENAME), "w").close()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def load(cls, directory):
+        """Reads the journal from ``directory``, for example to replay a session"""
+        journal = cls(directory)
+        with open(journal.filename) as f:
+            for line in f:
+                record = CommandRecord.from_json(json.loads(line))
+                journal.records.append(record)
+                for module in record.modules:
+                    journal.modules[module] = None
+        array_dir = os.path.join(directory, ARRAY_DIRECTORY)
+        if os.path.isdir(array_dir):
+            journal._n_arrays = len(os.listdir(array_dir))
+        return journal
@@ -0,0 +1,91 @@
+"""IPython extension for consoles running in a separate kernel process
+
+When ``rcParams["console_kernel"]`` is ``"external"`` the console of the
+gui talks to a kernel in its own process, so computations typed in the
+console do not stop the gui from rendering.  Datasets are exchanged
+between the two processes as container files (see
+``mesh_arrays.write_container``) that the receiving side memory-maps,
+rather than being pickled and sent through the kernel messages.
+
+This module is loaded in the kernel with ``%load_ext pyvista_gui.kernel``
+and does not import Qt.
+
+Examples
+--------
+In the console of the gui
+
+>>> import pyvista
+>>> sphere = pyvista.Sphere()
+>>> %push_to_viewer sphere
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+import pyvista
+
+from pyvista_gui.mesh_arrays import (
+    arrays_to_dataset,
+    dataset_to_arrays,
+    read_container,
+    write_container,
+)
+
+# mimetype of the display data announcing a dataset to the viewer
+DATASET_MIMETYPE = "application/vnd.pyvista-gui.dataset+json"
+
+_EXCHANGE_DIRECTORY = None
+
+
+def exchange_directory():
+    """Temporary directory of the datasets written by this process"""
+    global _EXCHANGE_DIRECTORY
+    if _EXCHANGE_DIRECTORY is None:
+        _EXCHANGE_DIRECTORY = tempfile.mkdtemp(prefix="pyvista_gui_exchange_")
+        atexit.register(shutil.rmtree, _EXCHANGE_DIRECTORY, True)
+    return _EXCHANGE_DIRECTORY
+
+
+def write_dataset(mesh, name):
+    """Writes a dataset to the exchange directory, returns the file name"""
+    meta, arrays = dataset_to_arrays(mesh)
+    fd, filename = tempfile.mkstemp(prefix=name + "_", suffix=".pvds", dir=exchange_directory())
+    os.close(fd)
+    write_container(filename, meta, arrays)
+    return filename
+
+
+def load_dataset(filename):
+    """Dataset written by ``write_dataset``, memory-mapping its arrays"""
+    meta, arrays = read_container(filename)
+    return arrays_to_dataset(meta, arrays)
+
+
+def push_to_viewer(line):
+    """Shows a dataset of the console in the viewer of the gui
+
+    Usage: ``%push_to_viewer variable [variable ...]``
+    """
+    from IPython import get_ipython
+    from IPython.display import publish_display_data
+
+    user_ns = get_ipython().user_ns
+    for name in line.split():
+        if name not in user_ns:
+            raise NameError("name %r is not defined" % name)
+        mesh = user_ns[name]
+        if not isinstance(mesh, (pyvista.DataSet, pyvista.MultiBlock)):
+            raise TypeError("%s is a %s, not a pyvista dataset" % (name, type(mesh).__name__))
+        filename = write_dataset(mesh, name)
+        publish_display_data(
+            {
+                DATASET_MIMETYPE: {"name": name, "filename": filename},
+                "text/plain": "Pushed %s to the viewer" % name,
+            }
+        )
+
+
+def load_ipython_extension(ipython):
+    ipython.register_magic_function(push_to_viewer, "line")
@@ -0,0 +1,287 @@
+"""Background loading of meshes from file"""
+
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+
+import pyvista
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from pyvista_gui.utilities import BATCH, get_worker_pool
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+# XML files that only reference the files of their pieces or blocks
+PARALLEL_EXTENSIONS = [".pvtu", ".pvtp", ".pvts", ".pvtr", ".pvti"]
+MULTIBLOCK_EXTENSIONS = [".vtm", ".vtmb"]
+
+
+class LoadCancelled(Exception):
+    """Raised within the loader thread when a load has been cancelled"""
+
+
+class MeshLoader(QThread):
+    """Reads a mesh from file on a worker thread.
+
+    The finished dataset is handed back to the GUI thread through the
+    ``loaded`` signal.  Progress is reported as an integer percentage
+    through ``progress`` and errors through ``failed``.
+
+    When a ``MeshCache`` is given, a cached copy of an unchanged file is
+    memory-mapped instead of read.  Files that are read are cached by a
+    batch job of the worker pool once ``loaded`` has been emitted, see
+    ``cache_write``.
+
+    Examples
+    --------
+    >>> loader = MeshLoader('/path/to/file.vtu')
+    >>> loader.loaded.connect(callback)
+    >>> loader.start()
+    """
+
+    progress = pyqtSignal(int)
+    loaded = pyqtSignal(object, str)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, filename, parent=None, cache=None):
+        super(MeshLoader, self).__init__(parent)
+        self.filename = os.path.abspath(os.path.expanduser(filename))
+        self.cache = cache
+        self._cancel = False
+        self._vtk_reader = None
+        self.cache_write = None  # future of the cache entry being written
+
+    @property
+    def is_cancelled(self):
+        return self._cancel
+
+    def cancel(self):
+        """Request the load to stop as soon as possible"""
+        LOG.debug("Cancelling load of %s", self.filename)
+        self._cancel = True
+        if self._vtk_reader is not None:
+            self._vtk_reader.SetAbortExecute(True)
+
+    def _on_vtk_progress(self, reader, event):
+        """Observer for the VTK reader ``ProgressEvent``"""
+        if self._cancel:
+            reader.SetAbortExecute(True)
+            return
+        self.progress.emit(int(reader.GetProgress() * 100))
+
+    def read(self):
+        """Read the file, reporting progress when the reader allows it"""
+        if not hasattr(pyvista, "get_reader"):
+            # older pyvista, no access to the underlying reader
+            return pyvista.read(self.filename)
+
+        try:
+            reader = pyvista.get_reader(self.filename)
+        except ValueError:
+            # unsupported by the reader classes, fall back to the generic reader
+            return pyvista.read(self.filename)
+
+        vtk_reader = getattr(reader, "reader", None)
+        if vtk_reader is not None and hasattr(vtk_reader, "AddObserver"):
+            self._vtk_reader = vtk_reader
+            vtk_reader.AddObserver("ProgressEvent", self._on_vtk_progress)
+        return reader.read()
+
+    def _cache_put(self, mesh):
+        """Caches a mesh that was read, the mesh is still loaded when this fails"""
+        try:
+            self.cache.put(self.filename, mesh)
+        except Exception as exception:
+            LOG.warning("Unable to cache %s: %s", self.filename, exception)
+
+    def run(self):
+        """Executed on the worker thread"""
+        LOG.debug("Loading %s", self.filename)
+        try:
+            if not os.path.isfile(self.filename):
+                raise FileNotFoundError('Unable to find mesh file "%s"' % self.filename)
+            mesh = None
+            cached = False
+            if self.cache is not None:
+                mesh = self.cache.get(self.filename)
+                cached = mesh is not None
+            if mesh is None:
+                mesh = self.read()
+            if self._cancel:
+                raise LoadCancelled()
+            if mesh is None:
+                raise ValueError('Unable to read "%s"' % self.filename)
+        except LoadCancelled:
+            self.cancelled.emit(self.filename)
+        except Exception as exception:
+            if self._cancel:
+                self.cancelled.emit(self.filename)
+            else:
+                LOG.error(exception)
+                self.failed.emit("Unable to load mesh", str(exception))
+        else:
+            self.progress.emit(100)
+            self.loaded.emit(mesh, self.filename)
+            if self.cache is not None and not cached:
+                self.cache_write = get_worker_pool().submit(self._cache_put, mesh, _priority=BATCH)
+        finally:
+            self._vtk_reader = None
+
+
+def file_pieces(filename):
+    """Files referenced by a parallel or MultiBlock XML file
+
+    Returns a list of ``(name, filename)`` for the ``Piece`` elements of a
+    parallel file (``.pvtu``, ``.pvtp``, ...) or the ``DataSet`` elements
+    of a MultiBlock file (``.vtm``), nested blocks included, in order.
+    Returns ``None`` for other files.  Only the small XML header is
+    parsed, none of the pieces are read.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in PARALLEL_EXTENSIONS:
+        tag, attribute = "Piece", "Source"
+    elif ext in MULTIBLOCK_EXTENSIONS:
+        tag, attribute = "DataSet", "file"
+    else:
+        return None
+
+    dirname = os.path.dirname(filename)
+    pieces = []
+    for element in ElementTree.parse(filename).iter(tag):
+        source = element.get(attribute)
+        if not source:
+            # empty block
+            continue
+        name = element.get("name") or os.path.splitext(os.path.basename(source))[0]
+        pieces.append((name, os.path.join(dirname, source)))
+    return pieces
+
+
+def multiblock_leaves(multiblock):
+    """Yields ``(name, block)`` for the non-empty leaves of a MultiBlock"""
+    for i in range(multiblock.n_blocks):
+        block = multiblock[i]
+        if isinstance(block, pyvista.MultiBlock):
+            yield from multiblock_leaves(block)
+        elif block is not None:
+            yield multiblock.get_block_name(i) or "Block %d" % i, block
+
+
+def read_pieces(filename):
+    """Reads the pieces of a file in the order ``StreamingMeshLoader`` adds them
+
+    Replays a streamed load in scripts saved from the gui.
+
+    Returns
+    -------
+    list of pyvista.DataSet
+
+    """
+    pieces = file_pieces(filename)
+    if pieces is None:
+        meshes = [pyvista.read(filename)]
+    else:
+        meshes = [pyvista.read(piece_filename) for _, piece_filename in pieces]
+
+    datasets = []
+    for mesh in meshes:
+        if isinstance(mesh, pyvista.MultiBlock):
+            datasets.extend(block for _, block in multiblock_leaves(mesh))
+        elif mesh is not None:
+            datasets.append(mesh)
+    return datasets
+
+
+class StreamingMeshLoader(MeshLoader):
+    """Reads a large mesh from file piece by piece on a worker thread
+
+    The pieces of parallel XML files (``.pvtu``, ``.pvtp``, ...) and the
+    blocks of MultiBlock files (``.vtm``) are read one at a time and each
+    is handed to the GUI thread through ``piece_loaded`` as soon as it has
+    been read, so the first geometry is shown long before the whole file
+    is read and at most one piece is being parsed at any time.
+
+    Other files are read whole.  When they hold a MultiBlock, its blocks
+    are emitted one at a time.  ``loaded`` is never emitted.  The pieces
+    are emitted in the order ``read_pieces`` returns them.
+
+    Examples
+    --------
+    >>> loader = StreamingMeshLoader('/path/to/file.pvtu')
+    >>> loader.piece_loaded.connect(callback)
+    >>> loader.start()
+    """
+
+    # piece, name of the piece and the file holding only this piece, or
+    # an empty string for blocks of a MultiBlock file that was read whole
+    piece_loaded = pyqtSignal(object, str, str)
+
+    def __init__(self, filename, parent=None):
+        super(StreamingMeshLoader, self).__init__(filename, parent)
+        self.n_pieces = 0
+
+    def read_piece(self, filename):
+        """Read a single piece, cancelled through the VTK reader"""
+        try:
+            reader = pyvista.get_reader(filename)
+        except (AttributeError, ValueError):
+            return pyvista.read(filename)
+        vtk_reader = getattr(reader, "reader", None)
+        if vtk_reader is not None and hasattr(vtk_reader, "SetAbortExecute"):
+            self._vtk_reader = vtk_reader
+        return reader.read()
+
+    def _emit_blocks(self, multiblock):
+        """Emits the non-empty leaves of a MultiBlock"""
+        for name, block in multiblock_leaves(multiblock):
+            if self._cancel:
+                raise LoadCancelled()
+            self.n_pieces += 1
+            self.piece_loaded.emit(block, name, "")
+
+    def run(self):
+        """Executed on the worker thread"""
+        LOG.debug("Streaming %s", self.filename)
+        try:
+            if not os.path.isfile(self.filename):
+                raise FileNotFoundError('Unable to find mesh file "%s"' % self.filename)
+
+            pieces = file_pieces(self.filename)
+            if pieces is None:
+                mesh = self.read()
+                if mesh is None:
+                    raise ValueError('Unable to read "%s"' % self.filename)
+                if isinstance(mesh, pyvista.MultiBlock):
+                    self._emit_blocks(mesh)
+                elif not self._cancel:
+                    self.n_pieces += 1
+                    self.piece_loaded.emit(mesh, os.path.basename(self.filename), self.filename)
+            else:
+                for i, (name, filename) in enumerate(pieces):
+                    if self._cancel:
+                        raise LoadCancelled()
+                    piece = self.read_piece(filename)
+                    self._vtk_reader = None
+                    if isinstance(piece, pyvista.MultiBlock):
+                        self._emit_blocks(piece)
+                    elif piece is not None:
+                        self.n_pieces += 1
+                        self.piece_loaded.emit(piece, name, filename)
+                    del piece
+                    self.progress.emit(int(100 * (i + 1) / len(pieces)))
+            if self._cancel:
+                raise LoadCancelled()
+        except LoadCancelled:
+            self.cancelled.emit(self.filename)
+        except Exception as exception:
+            if self._cancel:
+                self.cancelled.emit(self.filename)
+            else:
+                LOG.error(exception)
+                self.failed.emit("Unable to load mesh", str(exception))
+        else:
+            self.progress.emit(100)
+        finally:
+            self._vtk_reader = None
@@ -0,0 +1,203 @@
+"""Level of detail proxies of large meshes for fast interaction
+
+While the camera is being moved, each large mesh is replaced by a
+decimated proxy with at most ``rcParams["lod_budget"]`` cells, and the
+full resolution mesh is shown again as soon as the interaction ends.
+Proxies are computed on the worker pool once a mesh has been added, so
+loading is not slowed down and a mesh is simply shown at full
+resolution until its proxy is ready.
+"""
+
+import logging
+import math
+
+import pyvista
+from PyQt5.QtCore import QObject, pyqtSignal
+
+try:
+    from vtkmodules.vtkCommonDataModel import vtkPolyData
+    from vtkmodules.vtkFiltersCore import vtkQuadricClustering
+    from vtkmodules.vtkFiltersGeometry import vtkDataSetSurfaceFilter
+    from vtkmodules.vtkRenderingCore import vtkActor, vtkPolyDataMapper
+except ImportError:  # pragma: no cover
+    from vtk import (
+        vtkActor,
+        vtkDataSetSurfaceFilter,
+        vtkPolyData,
+        vtkPolyDataMapper,
+        vtkQuadricClustering,
+    )
+
+from pyvista_gui.options import rcParams
+from pyvista_gui.utilities import BATCH, get_worker_pool
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+
+def lod_proxy(mesh, budget):
+    """Decimated surface of ``mesh`` with roughly ``budget`` cells
+
+    The surface is decimated by vertex clustering, which is linear in
+    the number of cells.  The retained points are points of the input,
+    so point and cell data arrays are kept and the proxy is colored
+    like the mesh.
+    """
+    if isinstance(mesh, vtkPolyData):
+        surface = mesh
+    else:
+        surface_filter = vtkDataSetSurfaceFilter()
+        surface_filter.SetInputData(mesh)
+        surface_filter.Update()
+        surface = surface_filter.GetOutput()
+
+    # a closed surface clustered on a d^3 grid has about 12 d^2 triangles
+    divisions = max(2, int(math.sqrt(budget / 12.0)))
+    clustering = vtkQuadricClustering()
+    clustering.SetInputData(surface)
+    clustering.SetNumberOfDivisions(divisions, divisions, divisions)
+    clustering.UseInputPointsOn()
+    clustering.CopyCellDataOn()
+    clustering.Update()
+    return pyvista.wrap(clustering.GetOutput())
+
+
+class LODManager(QObject):
+    """Swaps large meshes for their proxies while the camera moves
+
+    Meshes with more than ``rcParams["lod_threshold"]`` cells get a
+    proxy, see ``lod_proxy``.  The proxy is a second actor sharing the
+    property and color mapping of the mesh actor, hidden except during
+    interaction, so swapping only toggles the visibility of two actors.
+
+    Parameters
+    ----------
+    plotter : pyvista.Plotter
+        Plotter the meshes are added to.
+
+    """
+
+    # gui mesh, future of its proxy.  Emitted from the worker thread
+    _proxy_done = pyqtSignal(object, object)
+
+    def __init__(self, plotter, parent=None):
+        super(LODManager, self).__init__(parent)
+        self.plotter = plotter
+        self.interacting = False
+        self.n_swaps = 0
+        self._pending = {}  # id(gui mesh) -> future of the proxy
+        self._proxies = {}  # id(gui mesh) -> (gui mesh, proxy actor)
+        self._stale = set()  # id(gui mesh) changed while its proxy was computed
+        self._hidden = []  # actors hidden during the current interaction
+        self._proxy_done.connect(self._add_proxy)
+
+        iren = getattr(plotter, "iren", None)
+        if iren is not None:
+            iren.add_observer("StartInteractionEvent", self._start_interaction)
+            iren.add_observer("EndInteractionEvent", self._end_interaction)
+
+    @property
+    def stats(self):
+        """Number of proxies ready and being computed, and swaps made"""
+        return {
+            "proxies": len(self._proxies),
+            "pending": len(self._pending),
+            "swaps": self.n_swaps,
+        }
+
+    def add(self, gui_mesh):
+        """Starts computing the proxy of a mesh when it is large enough"""
+        threshold = rcParams.get("lod_threshold")
+        mesh = gui_mesh.mesh
+        if not threshold or not isinstance(mesh, pyvista.DataSet) or mesh.n_cells <= threshold:
+            return None
+        budget = rcParams.get("lod_budget")
+        if mesh.n_cells <= budget:
+            return None
+
+        # a shallow copy keeps the arrays being decimated if the mesh's are swapped
+        future = get_worker_pool().submit(lod_proxy, mesh.copy(deep=False), budget, _priority=BATCH)
+        self._pending[id(gui_mesh)] = future
+        future.add_done_callback(lambda future: self._proxy_done.emit(gui_mesh, future))
+        return future
+
+    def _add_proxy(self, gui_mesh, future):
+        """Adds a finished proxy to the plotter.  Run on the GUI thread"""
+        if self._pending.get(id(gui_mesh)) is not future:
+            # removed while the proxy was computed
+            return
+        del self._pending[id(gui_mesh)]
+        if id(gui_mesh) in self._stale:
+            self._stale.discard(id(gui_mesh))
+            self.add(gui_mesh)
+            return
+        if future.cancelled() or future.exception() is not None or gui_mesh.actor is None:
+            if not future.cancelled() and future.exception() is not None:
+                LOG.error("Unable to compute proxy of %s: %s", gui_mesh, future.exception())
+            return
+
+        proxy = future.result()
+        actor = gui_mesh.actor
+        mapper = vtkPolyDataMapper()
+        # lookup table, scalar range and array selection of the full mesh
+        mapper.ShallowCopy(actor.GetMapper())
+        mapper.SetInputData(proxy)
+
+        proxy_actor = vtkActor()
+        proxy_actor.SetMapper(mapper)
+        proxy_actor.SetProperty(actor.GetProperty())
+        proxy_actor.SetUserMatrix(actor.GetUserMatrix())
+        proxy_actor.SetPickable(False)
+        proxy_actor.SetVisibility(False)
+        self.plotter.add_actor(proxy_actor, name=gui_mesh.varname + "-lod", reset_camera=False)
+        self._proxies[id(gui_mesh)] = (gui_mesh, proxy_actor)
+        LOG.debug("Added %d cell proxy of %s", proxy.n_cells, gui_mesh)
+
+    def remove(self, gui_mesh):
+        """Removes the proxy of a mesh, or stops waiting for it"""
+        self._stale.discard(id(gui_mesh))
+        future = self._pending.pop(id(gui_mesh), None)
+        if future is not None:
+            future.cancel()
+        entry = self._proxies.pop(id(gui_mesh), None)
+        if entry is not None:
+            self.plotter.remove_actor(entry[1])
+
+    def refresh(self, gui_mesh):
+        """Replaces the proxy of a mesh whose points or arrays have changed
+
+        The stale proxy is removed at once, so it is never shown.  A proxy
+        already being computed is finished and then computed again, so at
+        most one proxy is computed per mesh however often it changes.
+        """
+        key = id(gui_mesh)
+        entry = self._proxies.pop(key, None)
+        if entry is not None:
+            self.plotter.remove_actor(entry[1])
+        future = self._pending.get(key)
+        if future is not None and not future.cancel():
+            self._stale.add(key)
+            return future
+        self._pending.pop(key, None)
+        return self.add(gui_mesh)
+
+    def _start_interaction(self, *args):
+        if self.interacting:
+            return
+        self.interacting = True
+        for gui_mesh, proxy_actor in self._proxies.values():
+            actor = gui_mesh.actor
+            if actor is not None and actor.GetVisibility():
+                actor.SetVisibility(False)
+                proxy_actor.SetVisibility(True)
+                self._hidden.append((actor, proxy_actor))
+        if self._hidden:
+            self.n_swaps += 1
+
+    def _end_interaction(self, *args):
+        # the interactor renders once the interaction has ended
+        self.interacting = False
+        for actor, proxy_actor in self._hidden:
+            proxy_actor.SetVisibility(False)
+            actor.SetVisibility(True)
+        self._hidden = []
@@ -0,0 +1,88 @@
+"""Meshes as they are displayed within the gui"""
+
+import logging
+
+from PyQt5.QtWidgets import QMenu
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+TREE_HEADER = "Meshes"
+
+
+class GuiMesh(object):
+    """A pyvista dataset added to the plotter, object tree and console
+
+    Parameters
+    ----------
+    mesh : pyvista.DataSet or pyvista.MultiBlock
+        Dataset to display.  Held by reference and never copied.
+
+    parent : GUIWindow
+        Main gui window.
+
+    name : str, optional
+        Name displayed in the object tree.  Defaults to the variable name.
+
+    reset_camera : bool, optional
+        Reset the camera after adding the mesh to the plotter.
+
+    header : str, optional
+        Object tree header the mesh is listed under.
+
+    varname : str, optional
+        Console variable holding the mesh, for meshes created in the
+        console.  By default a new variable is created.
+
+    """
+
+    def __init__(
+        self, mesh, parent, name=None, reset_camera=True, header=TREE_HEADER, varname=None
+    ):
+        self.parent = parent
+        self.mesh = mesh
+        self.class_name = type(mesh).__name__
+        self.varname = varname if varname else parent.data.new_varname("Mesh")
+        self.name = name if name else self.varname
+        self.exceptions = []
+        self.threads = []
+        self._menu = None
+
+        self.actor = parent.plotter.add_mesh(mesh, name=self.varname, reset_camera=reset_camera)
+        parent.data.meshes.append(self)
+        parent.tree.addItem(self, header)
+        parent.lod.add(self)
+        if varname is None:
+            parent.console.push_vars({self.varname: mesh})
+
+    def __repr__(self):
+        return "%s(%s, %s)" % (type(self).__name__, self.varname, self.class_name)
+
+    @property
+    def menu(self):
+        """Context menu shown when right clicking on the item in the tree"""
+        if self._menu is None:
+            self._menu = QMenu(self.parent)
+            if self.class_name == "MultiBlock":
+                action = self._menu.addAction("Show Blocks")
+                action.triggered.connect(lambda: self.parent.show_blocks(self))
+            action = self._menu.addAction("Remove")
+            action.triggered.connect(self.remove)
+        return self._menu
+
+    def store_command(self, command):
+        """Stores a command when the gui is recording commands"""
+        if command is not None and self.parent.save_commands:
+            record = self.parent.data.store_command(command)
+            self.parent.command_history.add_command(self.parent.data.journal.render(record))
+
+    def remove(self):
+        """Removes this mesh from the plotter, tree and database"""
+        self.parent.lod.remove(self)
+        self.parent.clear_blocks(self.mesh)
+        if self.actor is not None:
+            self.parent.plotter.remove_actor(self.actor)
+            self.actor = None
+        self.parent.tree.remove_item(self)
+        self.parent.data.remove(self)
+        self.parent.trigger_render.emit()
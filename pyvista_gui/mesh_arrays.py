@@ -0,0 +1,297 @@
+"""Conversion of datasets to and from flat numpy arrays
+
+A dataset is described by a JSON serializable ``meta`` dictionary and a
+flat dictionary of named numpy arrays holding its points, cells and data
+arrays.  Datasets rebuilt from arrays reference them without copying
+where VTK allows it, which lets arrays live in shared or memory-mapped
+memory.
+"""
+
+import json
+import logging
+import os
+import struct
+import tempfile
+
+import numpy as np
+import pyvista
+
+try:
+    from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+    from vtkmodules.vtkCommonCore import vtkPoints, vtkStringArray
+    from vtkmodules.vtkCommonDataModel import vtkCompositeDataSet
+except ImportError:  # pragma: no cover
+    from vtk import vtkCompositeDataSet, vtkPoints, vtkStringArray
+    from vtk.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+# pyvista renamed UniformGrid to ImageData
+IMAGE_DATA = getattr(pyvista, "ImageData", None) or getattr(pyvista, "UniformGrid")
+
+POLY_CELLS = ["verts", "lines", "faces", "strips"]
+
+# datasets with explicit points
+POINT_SETS = (pyvista.PolyData, pyvista.UnstructuredGrid, pyvista.StructuredGrid)
+
+
+def _attributes(mesh):
+    return [
+        ("point_data", mesh.GetPointData()),
+        ("cell_data", mesh.GetCellData()),
+        ("field_data", mesh.GetFieldData()),
+    ]
+
+
+def _flatten(mesh, prefix, arrays):
+    """Adds the arrays of ``mesh`` to ``arrays`` and returns its meta"""
+    if isinstance(mesh, pyvista.MultiBlock):
+        blocks = []
+        for i in range(mesh.n_blocks):
+            block = mesh[i]
+            sub_meta = None
+            if block is not None:
+                sub_meta = _flatten(block, "%sblocks/%d/" % (prefix, i), arrays)
+            blocks.append({"name": mesh.get_block_name(i), "meta": sub_meta})
+        return {"type": "MultiBlock", "blocks": blocks}
+
+    meta = {"type": type(mesh).__name__}
+    if isinstance(mesh, pyvista.PolyData):
+        for name in POLY_CELLS:
+            cells = getattr(mesh, name)
+            if cells.size:
+                arrays[prefix + name] = cells
+    elif isinstance(mesh, pyvista.UnstructuredGrid):
+        arrays[prefix + "cells"] = mesh.cells
+        arrays[prefix + "celltypes"] = mesh.celltypes
+    elif isinstance(mesh, pyvista.StructuredGrid):
+        meta["dimensions"] = list(mesh.dimensions)
+    elif isinstance(mesh, IMAGE_DATA):
+        meta["extent"] = list(mesh.GetExtent())
+        meta["spacing"] = list(mesh.GetSpacing())
+        meta["origin"] = list(mesh.GetOrigin())
+    elif isinstance(mesh, pyvista.RectilinearGrid):
+        arrays[prefix + "x"] = vtk_to_numpy(mesh.GetXCoordinates())
+        arrays[prefix + "y"] = vtk_to_numpy(mesh.GetYCoordinates())
+        arrays[prefix + "z"] = vtk_to_numpy(mesh.GetZCoordinates())
+    else:
+        raise TypeError("Unsupported dataset type %s" % type(mesh).__name__)
+
+    if isinstance(mesh, POINT_SETS) and mesh.GetPoints() is not None:
+        arrays[prefix + "points"] = vtk_to_numpy(mesh.GetPoints().GetData())
+
+    for attribute, vtk_data in _attributes(mesh):
+        names = []
+        for i in range(vtk_data.GetNumberOfArrays()):
+            vtk_array = vtk_data.GetAbstractArray(i)
+            name = vtk_array.GetName()
+            if not name or not (vtk_array.IsA("vtkDataArray") or vtk_array.IsA("vtkStringArray")):
+                LOG.warning(
+                    "Skipping %s array %s of %s %s",
+                    vtk_array.GetClassName(),
+                    name,
+                    attribute,
+                    prefix or "/",
+                )
+                continue
+            names.append(name)
+            arrays["%s%s/%s" % (prefix, attribute, name)] = _to_numpy(vtk_array)
+        meta[attribute] = names
+
+    for attribute, vtk_data in _attributes(mesh)[:2]:
+        scalars = vtk_data.GetScalars()
+        if scalars is not None:
+            meta["active_%s" % attribute] = scalars.GetName()
+    return meta
+
+
+def _to_numpy(vtk_array):
+    """Numpy array of a data array, or UTF-8 bytes of a string array"""
+    if vtk_array.IsA("vtkStringArray"):
+        values = [vtk_array.GetValue(i) for i in range(vtk_array.GetNumberOfValues())]
+        return np.array([value.encode("utf-8") for value in values], dtype=bytes)
+    return vtk_to_numpy(vtk_array)
+
+
+def dataset_to_arrays(mesh):
+    """Splits a dataset into its ``meta`` and a dictionary of numpy arrays
+
+    Arrays are views of the dataset's memory where possible.  String
+    arrays are copied to arrays of UTF-8 encoded bytes.  Other arrays that
+    are not data arrays, and arrays without a name, are skipped with a
+    warning.
+    """
+    arrays = {}
+    meta = _flatten(mesh, "", arrays)
+    return meta, arrays
+
+
+def _to_vtk(array):
+    if array.dtype.kind == "S":
+        vtk_array = vtkStringArray()
+        vtk_array.SetNumberOfValues(len(array))
+        for i, value in enumerate(array):
+            vtk_array.SetValue(i, value.decode("utf-8"))
+        return vtk_array
+    return numpy_to_vtk(np.ascontiguousarray(array), deep=False)
+
+
+def _build(meta, prefix, arrays):
+    kind = meta["type"]
+    if kind == "MultiBlock":
+        mesh = pyvista.MultiBlock()
+        mesh.SetNumberOfBlocks(len(meta["blocks"]))
+        for i, block in enumerate(meta["blocks"]):
+            if block["meta"] is not None:
+                mesh.SetBlock(i, _build(block["meta"], "%sblocks/%d/" % (prefix, i), arrays))
+            if block["name"] is not None:
+                mesh.GetMetaData(i).Set(vtkCompositeDataSet.NAME(), block["name"])
+        return mesh
+
+    if kind == "PolyData":
+        mesh = pyvista.PolyData()
+        for name in POLY_CELLS:
+            if prefix + name in arrays:
+                setattr(mesh, name, arrays[prefix + name])
+    elif kind == "UnstructuredGrid":
+        mesh = pyvista.UnstructuredGrid(
+            arrays[prefix + "cells"], arrays[prefix + "celltypes"], arrays[prefix + "points"]
+        )
+    elif kind == "StructuredGrid":
+        mesh = pyvista.StructuredGrid()
+        mesh.SetDimensions(meta["dimensions"])
+    elif kind == "RectilinearGrid":
+        x, y, z = [arrays[prefix + axis] for axis in "xyz"]
+        mesh = pyvista.RectilinearGrid()
+        mesh.SetDimensions(len(x), len(y), len(z))
+        mesh.SetXCoordinates(_to_vtk(x))
+        mesh.SetYCoordinates(_to_vtk(y))
+        mesh.SetZCoordinates(_to_vtk(z))
+    elif kind in ("ImageData", "UniformGrid"):
+        mesh = IMAGE_DATA()
+        mesh.SetExtent(meta["extent"])
+        mesh.SetSpacing(meta["spacing"])
+        mesh.SetOrigin(meta["origin"])
+    else:
+        raise TypeError("Unsupported dataset type %s" % kind)
+
+    if prefix + "points" in arrays and kind != "UnstructuredGrid":
+        points = vtkPoints()
+        points.SetData(_to_vtk(arrays[prefix + "points"]))
+        mesh.SetPoints(points)
+
+    for attribute, vtk_data in _attributes(mesh):
+        for name in meta.get(attribute, []):
+            vtk_array = _to_vtk(arrays["%s%s/%s" % (prefix, attribute, name)])
+            vtk_array.SetName(name)
+            vtk_data.AddArray(vtk_array)
+
+    for attribute, vtk_data in _attributes(mesh)[:2]:
+        active = meta.get("active_%s" % attribute)
+        if active is not None:
+            vtk_data.SetActiveScalars(active)
+    return mesh
+
+
+def arrays_to_dataset(meta, arrays):
+    """Rebuilds a dataset from ``dataset_to_arrays`` output
+
+    Points and data arrays reference the given arrays without copying,
+    so they must stay alive, and unchanged, as long as the dataset.
+    """
+    return _build(meta, "", arrays)
+
+
+def nbytes(arrays):
+    """Total size of the arrays in bytes"""
+    return sum(array.nbytes for array in arrays.values())
+
+
+# single file container of JSON meta and raw arrays
+CONTAINER_MAGIC = b"PVGUI\x00\x01\x00"
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_container(filename, meta, arrays):
+    """Writes ``meta`` and ``arrays`` to a single uncompressed file
+
+    The file holds ``CONTAINER_MAGIC``, the length of a JSON index as a
+    little-endian uint64, the index, and then the raw bytes of each
+    array aligned to ``ALIGNMENT`` bytes.  The file is written to a
+    temporary file that replaces ``filename`` once complete, and that is
+    removed when writing fails.
+    """
+    index = {"meta": meta, "arrays": {}}
+    offset = 0
+    contiguous = {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        contiguous[key] = array
+        index["arrays"][key] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps(index).encode("utf-8")
+    data_start = _aligned(len(CONTAINER_MAGIC) + 8 + len(header))
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_filename = tempfile.mkstemp(suffix=".tmp", dir=dirname)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(CONTAINER_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for key, array in contiguous.items():
+                f.seek(data_start + index["arrays"][key]["offset"])
+                f.write(memoryview(array).cast("B"))
+            f.truncate(data_start + offset)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        # for example a full disk, do not leave a partial file behind
+        try:
+            os.remove(tmp_filename)
+        except OSError:
+            pass
+        raise
+
+
+def read_container(filename, mmap=True):
+    """Reads a file written by ``write_container``
+
+    With ``mmap`` the arrays are copy-on-write memory maps of the file:
+    opening is nearly instant and only the pages that are used are read.
+    Changes to the arrays are never written back.
+
+    Returns
+    -------
+    meta : dict
+    arrays : dict of numpy.ndarray
+
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(CONTAINER_MAGIC)) != CONTAINER_MAGIC:
+            raise ValueError("%s is not a pyvista_gui container" % filename)
+        (length,) = struct.unpack("<Q", f.read(8))
+        index = json.loads(f.read(length).decode("utf-8"))
+    data_start = _aligned(len(CONTAINER_MAGIC) + 8 + length)
+
+    if mmap:
+        buffer = np.memmap(filename, dtype=np.uint8, mode="c")
+    else:
+        buffer = np.fromfile(filename, dtype=np.uint8)
+
+    arrays = {}
+    for key, spec in index["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = data_start + spec["offset"]
+        count = int(np.prod(spec["shape"]))
+        view = buffer[start : start + count * dtype.itemsize].view(dtype)
+        arrays[key] = view.reshape(spec["shape"])
+    return index["meta"], arrays
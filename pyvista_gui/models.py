@@ -0,0 +1,144 @@
+"""Item models for displaying datasets"""
+
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+try:
+    from vtkmodules.vtkCommonDataModel import vtkCompositeDataSet
+except ImportError:  # pragma: no cover
+    from vtk import vtkCompositeDataSet
+
+# number of child blocks added to the model per fetch
+FETCH_BATCH = 256
+
+COLUMNS = ["Block", "Type", "Cells", "Memory"]
+
+
+def format_kib(kib):
+    """Human readable size from a size in kibibytes"""
+    for unit in ["KiB", "MiB", "GiB"]:
+        if kib < 1024:
+            return "%.1f %s" % (kib, unit)
+        kib /= 1024.0
+    return "%.1f TiB" % kib
+
+
+class _BlockNode(object):
+    """Node of the model referencing a block by its parent and index"""
+
+    __slots__ = ["parent", "row", "block", "name", "children", "_stats"]
+
+    def __init__(self, parent, row, block, name):
+        self.parent = parent
+        self.row = row
+        self.block = block
+        self.name = name
+        self.children = []
+        self._stats = None
+
+    @property
+    def n_blocks(self):
+        if self.block is None or not self.block.IsA("vtkMultiBlockDataSet"):
+            return 0
+        return self.block.GetNumberOfBlocks()
+
+    @property
+    def stats(self):
+        """Class name, number of cells and memory, computed once when first shown"""
+        if self._stats is None:
+            if self.block is None:
+                self._stats = ("Empty", "", "")
+            else:
+                self._stats = (
+                    self.block.GetClassName(),
+                    "{:,}".format(self.block.GetNumberOfCells()),
+                    format_kib(self.block.GetActualMemorySize()),
+                )
+        return self._stats
+
+
+class MultiBlockModel(QAbstractItemModel):
+    """Read-only tree model over the hierarchy of a ``pyvista.MultiBlock``
+
+    Children are fetched on demand in batches of ``FETCH_BATCH`` as
+    nodes are expanded and scrolled, directly from the dataset, so only
+    the visible part of the hierarchy has model nodes.  No data is copied.
+    Cell counts and memory are only computed for rows that are displayed.
+    """
+
+    def __init__(self, multiblock, name="MultiBlock", parent=None):
+        super(MultiBlockModel, self).__init__(parent)
+        self._root = _BlockNode(None, 0, None, "")
+        self._root.children.append(_BlockNode(self._root, 0, multiblock, name))
+
+    @property
+    def multiblock(self):
+        """The MultiBlock shown by the model"""
+        return self._root.children[0].block
+
+    def _node(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self._root
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if 0 <= row < len(node.children) and 0 <= column < len(COLUMNS):
+            return self.createIndex(row, column, node.children[row])
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        return node is self._root or node.n_blocks > 0
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node is not self._root and len(node.children) < node.n_blocks
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        start = len(node.children)
+        end = min(start + FETCH_BATCH, node.n_blocks)
+        if end <= start:
+            return
+
+        self.beginInsertRows(parent, start, end - 1)
+        block = node.block
+        for i in range(start, end):
+            name = None
+            if block.HasMetaData(i):
+                name = block.GetMetaData(i).Get(vtkCompositeDataSet.NAME())
+            node.children.append(_BlockNode(node, i, block.GetBlock(i), name or "Block-%d" % i))
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        node = index.internalPointer()
+        if index.column() == 0:
+            return node.name
+        return node.stats[index.column() - 1]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def block(self, index):
+        """Returns the VTK dataset at ``index``"""
+        return self._node(index).block
@@ -1,39 +1,176 @@
 """Options for saving user prefences, etc."""
 
+import atexit
 import json
+import logging
 import os
+import tempfile
+import threading
+import time
 
 import pyvista
 from pyvista.examples import USER_DATA_PATH
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
 
 class RcParams(dict):
-    """Internally used class to manage the rcParams"""
+    """Internally used class to manage the rcParams
+
+    Changes are written behind: assignments are merged and written to
+    ``filename`` once no further changes have been made for ``delay``
+    seconds, and at exit, by a single writer thread started on the first
+    change.  Assigning a value equal to the current one is not a change.
+    Set ``write_behind`` to ``False`` to write on every assignment.
+
+    Only changed keys are written and they are merged with the current
+    contents of the file, so several gui processes sharing
+    ``USER_DATA_PATH`` do not overwrite each other's changes.  The file is
+    replaced atomically and never seen partially written.
+    """
 
     filename = os.path.join(USER_DATA_PATH, "rcParams.json")
+    write_behind = True
+    delay = 1.0
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._lock = threading.RLock()
+        self._changes = threading.Condition(self._lock)
+        self._dirty = set()
+        self._deadline = None  # time.monotonic() of the next write
+        self._writer = None
+
+    def _read(self):
+        try:
+            with open(self.filename, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
 
-    def save(self):
-        with open(self.filename, "w") as f:
-            json.dump(self, f)
-        return
+    def save(self, keys=None):
+        """Writes ``keys`` to file, or all keys when ``None``"""
+        with self._lock:
+            self._deadline = None
+            if keys is None:
+                keys = list(self)
+            changes = {key: self[key] for key in keys}
+            self._dirty.clear()
+
+            dirname = os.path.dirname(self.filename)
+            os.makedirs(dirname, exist_ok=True)
+            with open(self.filename + ".lock", "w") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                data = self._read()
+                data.update(changes)
+
+                fd, tmp_filename = tempfile.mkstemp(prefix=".rcParams", suffix=".tmp", dir=dirname)
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(data, f)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_filename, self.filename)
+                except BaseException:
+                    os.remove(tmp_filename)
+                    raise
+
+    def flush(self):
+        """Writes any pending changes immediately"""
+        with self._lock:
+            if self._dirty:
+                self.save(list(self._dirty))
 
     def load(self):
         with open(self.filename, "r") as f:
             data = json.load(f)
-        self.update(data)
+        dict.update(self, data)
+
+    def _write_behind(self):
+        """Writes the changes once none have been made for ``delay`` seconds"""
+        with self._changes:
+            while True:
+                if self._deadline is None:
+                    self._changes.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._changes.wait(remaining)
+                    continue
+                self._deadline = None
+                try:
+                    self.flush()
+                except Exception:
+                    LOG.exception("Could not write %s", self.filename)
+
+    def _changed(self, keys):
+        """Records changed keys and writes them now or after a quiet period"""
+        with self._lock:
+            self._dirty.update(keys)
+            if not self.write_behind:
+                self.flush()
+                return
+            self._deadline = time.monotonic() + self.delay
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_behind, name="rcParams writer", daemon=True
+                )
+                self._writer.start()
+            self._changes.notify()
 
     def __setitem__(self, key, value):
-        dict.__setitem__(self, key, value)
-        self.save()
+        with self._lock:
+            if key in self and self[key] == value:
+                return
+            dict.__setitem__(self, key, value)
+            self._changed([key])
+
+    def update(self, *args, **kwargs):
+        """Updates several options, writing them to file once"""
+        with self._lock:
+            changes = {
+                key: value
+                for key, value in dict(*args, **kwargs).items()
+                if key not in self or self[key] != value
+            }
+            if changes:
+                dict.update(self, changes)
+                self._changed(changes)
 
 
-# The options
-rcParams = RcParams(
+# The options and their defaults
+DEFAULTS = dict(
     dark_mode=False,
+    worker_threads=4,
+    log_max_lines=10000,
+    log_flush_interval=100,
+    command_history_size=10000,  # older commands are spilled to file
+    max_fps=30,
+    autosave_interval=60,
+    mesh_cache_size=4096,  # MiB, 0 disables the cache
+    lod_threshold=1000000,  # cells, 0 disables level of detail proxies
+    lod_budget=200000,  # approximate cells of a proxy
+    perf_interval=500,  # ms between updates of the performance panel
+    watch_console=True,  # show datasets assigned in the console
+    console_kernel="inprocess",  # or "external" to run the kernel in its own process
+    playback_fps=24,
+    playback_prefetch=8,  # time steps read ahead
+    playback_cache_size=16,  # time steps kept in memory
+    playback_mesh_cache=False,  # also keep time steps played in the mesh cache
 )
+rcParams = RcParams(DEFAULTS)
 
 # Load user prefences from last session if none exist, save defaults
 try:
     rcParams.load()
 except:
     rcParams.save()
+
+atexit.register(rcParams.flush)
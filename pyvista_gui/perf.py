@@ -0,0 +1,190 @@
+"""Render time and memory instrumentation
+
+Examples
+--------
+From the console of the gui
+
+>>> gui.perf.sample()
+{'render_time': 0.0041, 'fps': 243.9, 'actors': 2, ...}
+>>> print(gui.perf.report())
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+
+import pyvista
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QFormLayout, QLabel, QWidget
+
+from pyvista_gui.models import format_kib
+from pyvista_gui.options import rcParams
+from pyvista_gui.utilities import get_worker_pool
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+LABELS = OrderedDict(
+    [
+        ("render_time", "Render time"),
+        ("fps", "Frame rate"),
+        ("actors", "Actors"),
+        ("points", "Points"),
+        ("cells", "Cells"),
+        ("rss", "Process memory"),
+        ("vtk_memory", "Dataset memory"),
+        ("queue_depth", "Worker queue"),
+    ]
+)
+
+
+def process_rss():
+    """Resident memory of this process in KiB"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024.0
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024.0
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # peak rather than current on platforms without /proc
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    return 0.0
+
+
+class PerfMonitor(QObject):
+    """Collects render times and memory use of the gui
+
+    Every render of the render window is timed through its ``StartEvent``
+    and ``EndEvent``, including renders made by the interactor, at the
+    cost of two clock reads per frame.  All other figures are only
+    computed when ``sample`` is called.
+
+    Parameters
+    ----------
+    gui : GUIWindow
+        Main gui window.
+
+    """
+
+    def __init__(self, gui, parent=None):
+        super(PerfMonitor, self).__init__(parent)
+        self.gui = gui
+        self.frame_times = deque(maxlen=120)
+        self._tstart = None
+
+        render_window = getattr(gui.plotter, "render_window", None) or gui.plotter.ren_win
+        render_window.AddObserver("StartEvent", self._render_started)
+        render_window.AddObserver("EndEvent", self._render_ended)
+
+    def _render_started(self, *args):
+        self._tstart = time.perf_counter()
+
+    def _render_ended(self, *args):
+        if self._tstart is not None:
+            self.frame_times.append(time.perf_counter() - self._tstart)
+            self._tstart = None
+
+    def sample(self):
+        """Current figures
+
+        Returns
+        -------
+        dict
+            Mean render time over the last frames in seconds and the
+            frame rate it allows, number of actors, points and cells of
+            all meshes, resident memory of the process and memory of all
+            meshes in KiB, and number of calls queued on the worker pool.
+
+        """
+        n_frames = len(self.frame_times)
+        render_time = sum(self.frame_times) / n_frames if n_frames else 0.0
+
+        n_points = n_cells = 0
+        vtk_memory = 0
+        for gui_mesh in self.gui.data.meshes:
+            mesh = gui_mesh.mesh
+            if isinstance(mesh, pyvista.DataSet):
+                n_points += mesh.n_points
+                n_cells += mesh.n_cells
+            else:
+                n_points += mesh.GetNumberOfPoints()
+                n_cells += mesh.GetNumberOfCells()
+            vtk_memory += mesh.GetActualMemorySize()
+
+        return {
+            "render_time": render_time,
+            "fps": 1.0 / render_time if render_time else 0.0,
+            "actors": len(self.gui.plotter.renderer.actors),
+            "points": n_points,
+            "cells": n_cells,
+            "rss": process_rss(),
+            "vtk_memory": vtk_memory,
+            "queue_depth": get_worker_pool().queue_depth,
+        }
+
+    def format(self, values):
+        """Human readable form of the values returned by ``sample``"""
+        return {
+            "render_time": "%.1f ms" % (values["render_time"] * 1000),
+            "fps": "%.1f fps" % values["fps"],
+            "actors": "%d" % values["actors"],
+            "points": "{:,}".format(values["points"]),
+            "cells": "{:,}".format(values["cells"]),
+            "rss": format_kib(values["rss"]),
+            "vtk_memory": format_kib(values["vtk_memory"]),
+            "queue_depth": "%d" % values["queue_depth"],
+        }
+
+    def report(self):
+        """Current figures as text"""
+        values = self.format(self.sample())
+        return "\n".join("%-16s %s" % (label, values[key]) for key, label in LABELS.items())
+
+    def reset(self):
+        self.frame_times.clear()
+
+
+class PerformanceWidget(QWidget):
+    """Shows the figures of a ``PerfMonitor``
+
+    Sampled every ``rcParams["perf_interval"]`` milliseconds, only while
+    the widget is visible.
+    """
+
+    def __init__(self, monitor, parent=None):
+        super(PerformanceWidget, self).__init__(parent)
+        self.monitor = monitor
+        self.labels = {}
+        layout = QFormLayout(self)
+        for key, text in LABELS.items():
+            self.labels[key] = QLabel("", self)
+            layout.addRow(text, self.labels[key])
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.update_values)
+
+    def update_values(self):
+        for key, value in self.monitor.format(self.monitor.sample()).items():
+            self.labels[key].setText(value)
+
+    def showEvent(self, event):
+        super(PerformanceWidget, self).showEvent(event)
+        self.update_values()
+        self._timer.start(rcParams["perf_interval"])
+
+    def hideEvent(self, event):
+        super(PerformanceWidget, self).hideEvent(event)
+        self._timer.stop()
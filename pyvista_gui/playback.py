@@ -0,0 +1,527 @@
+"""Playback of time series such as transient simulation results
+
+Each time step is a separate file.  Upcoming steps are read ahead on
+the worker pool into a bounded cache, and every step is shown in a
+single mesh whose arrays are swapped for those of the step, so the
+actor is never rebuilt during playback.
+
+Examples
+--------
+From the console of the gui
+
+>>> player = gui.data.load_time_series('/path/to/results/step_*.vtu')
+>>> player.play()
+>>> player.stats
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import pyvista
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSlider,
+    QSpinBox,
+    QVBoxLayout,
+    QWidget,
+)
+
+from pyvista_gui.dialogs import SlidersGroup
+from pyvista_gui.mesh_arrays import POINT_SETS
+from pyvista_gui.options import rcParams
+from pyvista_gui.utilities import INTERACTIVE, get_worker_pool
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+
+def swap_arrays(target, source):
+    """Makes ``target`` show ``source`` without copying any array
+
+    When both have the same type and number of points and cells, the
+    topology of ``target`` is kept and only its points and data arrays
+    are replaced by those of ``source``.  Otherwise ``target`` becomes
+    a shallow copy of ``source``.
+
+    Returns
+    -------
+    bool
+        ``True`` when the topology was kept.
+
+    """
+    if (
+        type(target) is not type(source)
+        or not isinstance(target, pyvista.DataSet)
+        or target.n_points != source.n_points
+        or target.n_cells != source.n_cells
+    ):
+        target.shallow_copy(source)
+        return False
+
+    if isinstance(target, POINT_SETS):
+        target.SetPoints(source.GetPoints())
+
+    for target_data, source_data in (
+        (target.GetPointData(), source.GetPointData()),
+        (target.GetFieldData(), source.GetFieldData()),
+        (target.GetCellData(), source.GetCellData()),
+    ):
+        names = set()
+        for i in range(source_data.GetNumberOfArrays()):
+            array = source_data.GetAbstractArray(i)
+            names.add(array.GetName())
+            # replaces the array of the same name
+            target_data.AddArray(array)
+        for i in reversed(range(target_data.GetNumberOfArrays())):
+            name = target_data.GetAbstractArray(i).GetName()
+            if name not in names:
+                target_data.RemoveArray(name)
+    target.Modified()
+    return True
+
+
+class FrameCache(object):
+    """Bounded LRU cache of time steps read ahead on the worker pool
+
+    Parameters
+    ----------
+    filenames : list of str
+        File of each time step.
+
+    max_frames : int
+        Number of time steps kept in memory, including those being read.
+
+    read : callable, optional
+        Reads a time step from file.  Defaults to ``pyvista.read``.
+
+    Attributes
+    ----------
+    errors : dict
+        Exception raised reading each step that could not be read.  These
+        steps are not read again until the cache is cleared.
+
+    """
+
+    def __init__(self, filenames, max_frames, read=None):
+        self.filenames = list(filenames)
+        self.max_frames = max(1, max_frames)
+        self.read = read or pyvista.read
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_read = 0
+        self.errors = {}
+        self._frames = OrderedDict()  # index -> dataset, least recently used first
+        self._futures = {}  # index -> future of a step being read
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def _read(self, index):
+        try:
+            dataset = self.read(self.filenames[index])
+        except Exception as exception:
+            LOG.error("Unable to read step %d from %s: %s", index, self.filenames[index], exception)
+            with self._lock:
+                self._futures.pop(index, None)
+                self.errors[index] = exception
+            raise
+        with self._lock:
+            self.n_read += 1
+            if self._futures.pop(index, None) is not None:
+                self._frames[index] = dataset
+                self._trim()
+        return dataset
+
+    def _trim(self):
+        # called with the lock held
+        while len(self._frames) + len(self._futures) > self.max_frames and self._frames:
+            self._frames.popitem(last=False)
+
+    def get(self, index):
+        """The time step ``index`` when it has been read, otherwise ``None``
+
+        A step that is not cached or being read is requested, unless it
+        could not be read, see ``errors``.
+        """
+        with self._lock:
+            if index in self.errors:
+                return None
+            dataset = self._frames.get(index)
+            if dataset is not None:
+                self._frames.move_to_end(index)
+                self.n_hits += 1
+                return dataset
+            self.n_misses += 1
+        self.prefetch([index])
+        return None
+
+    def wait(self, index):
+        """Reads the time step ``index`` if needed and returns it
+
+        Raises the error of a step that could not be read.
+        """
+        dataset = self.get(index)
+        if dataset is None:
+            if index in self.errors:
+                raise self.errors[index]
+            future = self._futures.get(index)
+            if future is not None:
+                dataset = future.result()
+            else:
+                # the cache is full of steps being read
+                dataset = self.read(self.filenames[index])
+        return dataset
+
+    def request(self, index):
+        """Future of the time step ``index``, reading it if needed
+
+        Unlike ``wait`` this never blocks.  The future of a cached step is
+        already done, and that of a step that could not be read raises its
+        error.
+        """
+        future = Future()
+        with self._lock:
+            if index in self._futures:
+                return self._futures[index]
+            if index in self.errors:
+                future.set_exception(self.errors[index])
+                return future
+            if index in self._frames:
+                self._frames.move_to_end(index)
+                self.n_hits += 1
+                future.set_result(self._frames[index])
+                return future
+            self.n_misses += 1
+        self.prefetch([index])
+        with self._lock:
+            future = self._futures.get(index)
+        if future is None:
+            # the cache is full of steps being read, the step is read but not kept
+            future = get_worker_pool().submit(self._read, index, _priority=INTERACTIVE)
+        return future
+
+    def prefetch(self, indices):
+        """Starts reading the steps in ``indices`` that are not cached
+
+        Steps are read in order.  Steps beyond the capacity of the cache
+        are not read.
+        """
+        pool = get_worker_pool()
+        with self._lock:
+            for index in indices:
+                if index in self._frames or index in self._futures or index in self.errors:
+                    continue
+                if len(self._futures) >= self.max_frames:
+                    break
+                # reading is what keeps playback going, run before batch work
+                self._futures[index] = None
+                self._trim()
+                self._futures[index] = pool.submit(self._read, index, _priority=INTERACTIVE)
+
+    def clear(self):
+        with self._lock:
+            for future in self._futures.values():
+                if future is not None:
+                    future.cancel()
+            self._futures.clear()
+            self._frames.clear()
+            self.errors.clear()
+
+
+class TimeSeriesPlayer(QObject):
+    """Plays a time series in the gui at a steady frame rate
+
+    The first step is added to the gui as a ``GuiMesh``.  Every tick of
+    a timer at ``fps`` shows the next step by swapping its arrays into
+    that mesh, see ``swap_arrays``, while the following
+    ``rcParams["playback_prefetch"]`` steps are read ahead.  When a step
+    has not been read in time, the current step is kept for that tick,
+    counted in ``stats`` as a stall, so the frame rate stays steady
+    rather than the gui blocking on a read.  Steps that cannot be read
+    are skipped and counted in ``stats``.
+
+    Parameters
+    ----------
+    gui : GUIWindow
+        Main gui window.
+
+    filenames : list of str
+        File of each time step, in order.
+
+    name : str, optional
+        Name of the mesh in the object tree.
+
+    """
+
+    frame_changed = pyqtSignal(int)
+    playing_changed = pyqtSignal(bool)
+    # index, future of a step sought.  Emitted from the worker thread
+    _seek_read = pyqtSignal(int, object)
+
+    def __init__(self, gui, filenames, name=None, parent=None):
+        super(TimeSeriesPlayer, self).__init__(parent)
+        if not filenames:
+            raise ValueError("A time series needs at least one file")
+        self.gui = gui
+        self.cache = FrameCache(filenames, rcParams["playback_cache_size"], self._read)
+        self.n_prefetch = rcParams["playback_prefetch"]
+        self.first = 0
+        self.last = len(filenames) - 1
+        self.loop = True
+        self.index = 0
+        self.n_shown = 0
+        self.n_stalls = 0
+        self.n_skipped = 0
+        self.n_topology_changes = 0
+        self.frame_times = deque(maxlen=120)
+        self._paused_at = None
+        self._seek_index = None  # latest step sought and not shown yet
+        self._seek_read.connect(self._seek_done)
+
+        # the mesh is owned by the player, steps are swapped into it
+        first = self.cache.wait(0)
+        self.gui_mesh = gui.data.load_mesh(first.copy(deep=False), name=name)
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        self.fps = rcParams["playback_fps"]
+        self._prefetch_from(1)
+
+    def _read(self, filename):
+        """Reads a time step, through the mesh cache of the gui when enabled
+
+        With ``rcParams["playback_mesh_cache"]`` steps played before are
+        memory-mapped from the mesh cache rather than parsed again, so
+        later loops of a series read much faster, at the cost of writing
+        every step to the cache and evicting the meshes loaded in the gui.
+        """
+        mesh_cache = self.gui.data.cache if rcParams["playback_mesh_cache"] else None
+        if mesh_cache is not None:
+            mesh = mesh_cache.get(filename)
+            if mesh is not None:
+                return mesh
+        mesh = pyvista.read(filename)
+        if mesh_cache is not None:
+            try:
+                mesh_cache.put(filename, mesh)
+            except Exception as exception:
+                LOG.warning("Unable to cache %s: %s", filename, exception)
+        return mesh
+
+    @property
+    def n_frames(self):
+        return len(self.cache)
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @fps.setter
+    def fps(self, value):
+        self._fps = max(1, value)
+        self._timer.setInterval(int(round(1000.0 / self._fps)))
+
+    @property
+    def playing(self):
+        return self._timer.isActive()
+
+    @property
+    def stats(self):
+        """Frames shown, stalled and skipped, the frame rate achieved and cache use
+
+        The frame rate is measured over the last frames shown, up to now
+        or to when playback was paused, so stalls lower it.
+        """
+        n_times = len(self.frame_times)
+        end = time.perf_counter() if self.playing else self._paused_at
+        elapsed = end - self.frame_times[0] if n_times > 1 and end else 0.0
+        return {
+            "shown": self.n_shown,
+            "stalls": self.n_stalls,
+            "skipped": self.n_skipped,
+            "topology_changes": self.n_topology_changes,
+            "fps": (n_times - 1) / elapsed if elapsed else 0.0,
+            "target_fps": self.fps,
+            "cache_hits": self.cache.n_hits,
+            "cache_misses": self.cache.n_misses,
+            "read": self.cache.n_read,
+        }
+
+    def _next_index(self, index):
+        if index >= self.last:
+            return self.first if self.loop else None
+        return index + 1
+
+    def _prefetch_from(self, index):
+        indices = []
+        while index is not None and len(indices) < self.n_prefetch:
+            indices.append(index)
+            index = self._next_index(index)
+            if index in indices:
+                break
+        self.cache.prefetch(indices)
+
+    def play(self):
+        if not self.playing:
+            self.frame_times.clear()
+            self._timer.start()
+            self.playing_changed.emit(True)
+
+    def pause(self):
+        if self.playing:
+            self._timer.stop()
+            self._paused_at = time.perf_counter()
+            self.playing_changed.emit(False)
+
+    def toggle(self):
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def set_range(self, first, last):
+        """Limits playback to the steps ``first`` to ``last``"""
+        self.first = max(0, min(first, self.n_frames - 1))
+        self.last = max(self.first, min(last, self.n_frames - 1))
+
+    def show_frame(self, index):
+        """Shows step ``index``, returns ``False`` when it has not been read yet"""
+        dataset = self.cache.get(index)
+        if dataset is None:
+            return False
+        self._show(index, dataset)
+        return True
+
+    def _show(self, index, dataset):
+        if not swap_arrays(self.gui_mesh.mesh, dataset):
+            self.n_topology_changes += 1
+        # the proxy shows the previous step
+        self.gui.lod.refresh(self.gui_mesh)
+        self.index = index
+        self.n_shown += 1
+        self.frame_times.append(time.perf_counter())
+        self.gui.trigger_render.emit()
+        self.frame_changed.emit(index)
+        self._prefetch_from(self._next_index(index))
+
+    def seek(self, index):
+        """Shows step ``index`` once it has been read, without blocking the gui
+
+        A cached step is shown at once.  When several steps are sought
+        before they are read, such as while dragging the slider, only the
+        last one is shown.  Returns ``False`` when the step cannot be read.
+        """
+        if index in self.cache.errors:
+            return False
+        self._seek_index = index
+        future = self.cache.request(index)
+        future.add_done_callback(lambda future: self._seek_read.emit(index, future))
+        return True
+
+    def _seek_done(self, index, future):
+        """Shows a step sought once it has been read.  Run on the GUI thread"""
+        if index != self._seek_index:
+            # superseded by a later seek, or the player was closed
+            return
+        self._seek_index = None
+        if future.cancelled() or future.exception() is not None:
+            # logged by the cache
+            return
+        self._show(index, future.result())
+
+    def _tick(self):
+        index = self._next_index(self.index)
+        if index is None:
+            self.pause()
+            return
+        if self.show_frame(index):
+            return
+        if index in self.cache.errors:
+            # the current step stays shown, the next tick moves past it
+            self.index = index
+            self.n_skipped += 1
+            self._prefetch_from(self._next_index(index))
+        else:
+            self.n_stalls += 1
+
+    def close(self):
+        self.pause()
+        self._seek_index = None
+        self.cache.clear()
+
+
+class PlaybackWidget(QWidget):
+    """Controls of a ``TimeSeriesPlayer``
+
+    A slider selects the step shown, and a ``SlidersGroup`` the first and
+    last steps played.
+    """
+
+    def __init__(self, player, parent=None):
+        super(PlaybackWidget, self).__init__(parent)
+        self.player = player
+        last = player.n_frames - 1
+
+        self.button = QPushButton("Play", self)
+        self.button.clicked.connect(player.toggle)
+        player.playing_changed.connect(
+            lambda playing: self.button.setText("Pause" if playing else "Play")
+        )
+
+        self.fps_box = QSpinBox(self)
+        self.fps_box.setRange(1, 240)
+        self.fps_box.setSuffix(" fps")
+        self.fps_box.setValue(player.fps)
+        self.fps_box.valueChanged.connect(self._set_fps)
+
+        self.slider = QSlider(Qt.Horizontal, self)
+        self.slider.setRange(0, last)
+        self.slider.valueChanged.connect(self._seek)
+        self.label = QLabel(self)
+        player.frame_changed.connect(self._frame_changed)
+
+        # the lower slider is the first and the upper the last step played
+        self.range_sliders = SlidersGroup(Qt.Horizontal, "Range", self)
+        self.range_sliders.setMinimum(0)
+        self.range_sliders.setMaximum(last)
+        self.range_sliders.set_fixed_value(last)
+        self.range_sliders.set_nocheck_value(0)
+        self.range_sliders.nocheckvalueChanged.connect(self._set_range)
+        self.range_sliders.fixedvalueChanged.connect(self._set_range)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.button)
+        controls.addWidget(self.fps_box)
+        controls.addWidget(self.label)
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.slider)
+        layout.addWidget(self.range_sliders)
+        self._frame_changed(player.index)
+
+    def _set_fps(self, value):
+        self.player.fps = value
+
+    def _set_range(self, *args):
+        # SlidersGroup values are scaled by 1000
+        first = self.range_sliders.nocheck_slider.value() // 1000
+        last = self.range_sliders.fixed_slider.value() // 1000
+        self.player.set_range(first, last)
+
+    def _seek(self, index):
+        if index != self.player.index:
+            self.player.seek(index)
+
+    def _frame_changed(self, index):
+        self.slider.blockSignals(True)
+        self.slider.setValue(index)
+        self.slider.blockSignals(False)
+        self.label.setText("Step %d / %d" % (index + 1, self.player.n_frames))
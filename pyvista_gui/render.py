@@ -0,0 +1,93 @@
+"""Scheduling of plotter renders"""
+
+import logging
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+
+class RenderScheduler(QObject):
+    """Coalesces render requests into at most one render per frame
+
+    Any number of calls to ``request`` made within one frame interval
+    result in a single call to ``render``.  Must live on the GUI thread;
+    connect signals to ``request`` to request renders from other threads.
+
+    Parameters
+    ----------
+    render : callable
+        Performs the render, typically ``plotter.render``.
+
+    max_fps : float, optional
+        Maximum number of renders per second.  ``0`` disables the cap,
+        though requests are still merged within one event loop iteration.
+
+    """
+
+    def __init__(self, render, max_fps=30, parent=None):
+        super(RenderScheduler, self).__init__(parent)
+        self._render = render
+        self.max_fps = max_fps
+        self.n_requested = 0
+        self.n_performed = 0
+        self.frame_times = deque(maxlen=120)
+        self._last_render = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._do_render)
+
+    @property
+    def max_fps(self):
+        return self._max_fps
+
+    @max_fps.setter
+    def max_fps(self, value):
+        self._max_fps = value
+        self._interval = 1.0 / value if value else 0.0
+
+    @property
+    def pending(self):
+        """True when a render has been requested but not performed"""
+        return self._timer.isActive()
+
+    @property
+    def stats(self):
+        """Render counters and the mean render time in seconds"""
+        n_frames = len(self.frame_times)
+        return {
+            "requested": self.n_requested,
+            "performed": self.n_performed,
+            "coalesced": self.n_requested - self.n_performed,
+            "mean_render_time": sum(self.frame_times) / n_frames if n_frames else 0.0,
+        }
+
+    def request(self):
+        """Requests a render at the next frame"""
+        self.n_requested += 1
+        if self._timer.isActive():
+            return
+        delay = self._interval - (time.perf_counter() - self._last_render)
+        self._timer.start(max(0, int(delay * 1000)))
+
+    def flush(self):
+        """Immediately performs a pending render"""
+        if self._timer.isActive():
+            self._timer.stop()
+            self._do_render()
+
+    def reset_stats(self):
+        self.n_requested = 0
+        self.n_performed = 0
+        self.frame_times.clear()
+
+    def _do_render(self):
+        tstart = time.perf_counter()
+        self._last_render = tstart
+        self._render()
+        self.frame_times.append(time.perf_counter() - tstart)
+        self.n_performed += 1
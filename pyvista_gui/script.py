@@ -0,0 +1,172 @@
+"""Running Python scripts in the console one statement at a time"""
+
+import ast
+import logging
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+LOG = logging.getLogger(__name__)
+LOG.setLevel("DEBUG")
+
+
+def split_statements(source, filename="<script>"):
+    """Splits Python source into the source of its top-level statements
+
+    Decorators are kept with the definition they decorate, and
+    statements sharing a line, such as ``a = 1; b = 2``, are kept
+    together.  Comments between statements are dropped.
+
+    Raises
+    ------
+    SyntaxError
+        When ``source`` is not valid Python.
+
+    """
+    lines = source.splitlines()
+    ranges = []
+    for node in ast.parse(source, filename).body:
+        start = min([node.lineno] + [item.lineno for item in getattr(node, "decorator_list", [])])
+        end = node.end_lineno
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = max(end, ranges[-1][1])
+        else:
+            ranges.append([start, end])
+    return ["\n".join(lines[start - 1 : end]) for start, end in ranges]
+
+
+def uses_gui(statement):
+    """True when a statement references the ``gui`` of the console
+
+    Such statements can not be replayed without the gui, so the commands
+    the gui records for them are kept instead of their source.
+    """
+    return any(
+        isinstance(node, ast.Name) and node.id == "gui" for node in ast.walk(ast.parse(statement))
+    )
+
+
+class ScriptRunner(QObject):
+    """Executes a script in the console of the gui statement by statement
+
+    Each top-level statement is executed as its own console execution.
+    The next statement is only started from the event loop once the
+    console reports the previous one as executed, so the gui keeps
+    rendering and responding between statements and the script can be
+    cancelled.  Execution stops at the first statement raising an error.
+
+    Meshes loaded from file by a statement are read in the background,
+    see ``Data.load_mesh``.  The next statement is only started once they
+    have been added or have failed to load, so it can use them.
+
+    While running, ``gui.hold`` is set.  Commands made by the gui on
+    behalf of a statement are only recorded when the statement uses the
+    gui itself, see ``uses_gui``, until the meshes it loads are added.
+
+    Parameters
+    ----------
+    gui : GUIWindow
+        Main gui window.
+
+    source : str
+        Python source of the script.
+
+    filename : str, optional
+        File name used in syntax errors.
+
+    Examples
+    --------
+    >>> runner = ScriptRunner(gui, 'import pyvista\\nmesh = pyvista.Sphere()')
+    >>> runner.statement_done.connect(print)
+    >>> runner.start()
+    """
+
+    progress = pyqtSignal(int)
+    # index and source of a statement that executed successfully
+    statement_done = pyqtSignal(int, str)
+    # index and source of the statement that raised
+    statement_failed = pyqtSignal(int, str)
+    # True when every statement was executed
+    finished = pyqtSignal(bool)
+
+    def __init__(self, gui, source, filename="<script>", parent=None):
+        super(ScriptRunner, self).__init__(parent)
+        self.gui = gui
+        self.console = gui.console
+        self.filename = filename
+        self.statements = split_statements(source, filename)
+        self.n_executed = 0
+        self.running = False
+        self._cancel = False
+        self._waiting = False  # for meshes loaded by the last statement
+
+    def start(self):
+        """Starts executing the script and returns immediately"""
+        LOG.debug("Running %d statements of %s", len(self.statements), self.filename)
+        self.console.start_kernel()
+        self.console.executed.connect(self._on_executed)
+        self.running = True
+        self.gui.hold = True
+        # after the console has handled the replies of a kernel just started
+        QTimer.singleShot(0, self._run_next)
+
+    def cancel(self):
+        """Stops the script once the current statement has executed"""
+        LOG.debug("Cancelling %s", self.filename)
+        self._cancel = True
+        if self._waiting:
+            self.gui.data.cancel_loading()
+
+    def _run_next(self):
+        if self._cancel or self.n_executed == len(self.statements):
+            self._finish()
+            return
+        statement = self.statements[self.n_executed]
+        self.gui.save_commands = uses_gui(statement)
+        self.console.execute(statement)
+
+    def _on_executed(self, msg):
+        if not self.running:
+            return
+        index = self.n_executed
+        statement = self.statements[index]
+        if msg["content"]["status"] != "ok":
+            LOG.error("Error in statement %d of %s", index + 1, self.filename)
+            self.statement_failed.emit(index, statement)
+            self._cancel = True
+        else:
+            self.n_executed += 1
+            self.statement_done.emit(index, statement)
+            self.progress.emit(int(100 * self.n_executed / len(self.statements)))
+
+        if self.gui.data.loaders:
+            # resumed by loads_finished
+            self._waiting = True
+            return
+        # return to the event loop before executing the next statement
+        QTimer.singleShot(0, self._run_next)
+
+    def loads_finished(self):
+        """Resumes the script once all meshes being loaded are added
+
+        Called by ``Data`` when its last loader has finished.
+        """
+        if self._waiting:
+            self._waiting = False
+            QTimer.singleShot(0, self._run_next)
+
+    def _finish(self):
+        if not self.running:
+            return
+        self.running = False
+        self.console.executed.disconnect(self._on_executed)
+        self.gui.hold = False
+        self.gui.save_commands = True
+        completed = self.n_executed == len(self.statements)
+        if not completed:
+            LOG.info(
+                "Stopped %s after %d of %d statements",
+                self.filename,
+                self.n_executed,
+                len(self.statements),
+            )
+        self.finished.emit(completed)
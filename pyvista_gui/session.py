@@ -0,0 +1,85 @@
+"""Saving and loading gui sessions
+
+A session is a single container file (see ``mesh_arrays.write_container``)
+holding the points, cells and data arrays of every mesh uncompressed and
+aligned, along with the camera, background and object tree state.  When
+a session is loaded its arrays are memory-mapped, so opening even a very
+large session is nearly instant and only the pages that are rendered are
+read from disk.
+"""
+
+from pyvista_gui.mesh_arrays import (
+    arrays_to_dataset,
+    dataset_to_arrays,
+    read_container,
+    write_container,
+)
+
+SESSION_VERSION = 1
+
+
+def write_session(filename, meshes, state=None):
+    """Writes a session file
+
+    Parameters
+    ----------
+    filename : str
+        File to write.
+
+    meshes : list of tuple
+        ``(name, dataset)`` of each mesh.
+
+    state : dict, optional
+        JSON serializable gui state such as the camera position.
+
+    """
+    index = []
+    arrays = {}
+    for i, (name, mesh) in enumerate(meshes):
+        meta, mesh_arrays = dataset_to_arrays(mesh)
+        prefix = "meshes/%d/" % i
+        arrays.update((prefix + key, array) for key, array in mesh_arrays.items())
+        index.append({"name": name, "meta": meta})
+
+    meta = {"version": SESSION_VERSION, "meshes": index, "state": state or {}}
+    write_container(filename, meta, arrays)
+
+
+def _group_arrays(arrays):
+    """Splits the arrays of a session by mesh"""
+    groups = {}
+    for key, array in arrays.items():
+        _, i, name = key.split("/", 2)
+        groups.setdefault(int(i), {})[name] = array
+    return groups
+
+
+def read_session(filename, mmap=True):
+    """Reads a session file
+
+    Returns
+    -------
+    meshes : list of tuple
+        ``(name, dataset)`` of each mesh.  Datasets reference the
+        memory-mapped arrays of the file.
+
+    state : dict
+        Gui state saved with the session.
+
+    """
+    meta, arrays = read_container(filename, mmap)
+    if meta.get("version") != SESSION_VERSION:
+        raise ValueError("Unsupported session version %s" % meta.get("version"))
+
+    groups = _group_arrays(arrays)
+    meshes = []
+    for i, mesh in enumerate(meta["meshes"]):
+        meshes.append((mesh["name"], arrays_to_dataset(mesh["meta"], groups.get(i, {}))))
+    return meshes, meta["state"]
+
+
+def read_session_mesh(filename, index):
+    """Reads a single mesh of a session file, used by saved command scripts"""
+    meta, arrays = read_container(filename)
+    groups = _group_arrays(arrays)
+    return arrays_to_dataset(meta["meshes"][index]["meta"], groups.get(index, {}))
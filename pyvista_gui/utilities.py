@@ -1,25 +1,37 @@
+import itertools
 import logging
+import os
 import sys
-import time
 import traceback
-from functools import wraps
-from threading import Thread
+from concurrent.futures import Future
+from functools import lru_cache, wraps
+from queue import PriorityQueue
+from threading import Lock, Thread
+
+from PyQt5.QtCore import QEventLoop, QObject, pyqtSignal
 
 log = logging.getLogger(__name__)
 log.setLevel("DEBUG")
 
 
-# python 2/3 string compatability
-if sys.version[0] == "2":
-    from past.builtins import basestring
-else:
-    basestring = str
+@lru_cache(maxsize=None)
+def dark_stylesheet():
+    """Returns the qdarkstyle style sheet, built once per process"""
+    import qdarkstyle
+
+    return qdarkstyle.load_stylesheet_pyqt5()
 
 
 def build_command(obj, func, *args, **kwargs):
-    """build a command for a non-gui session of pyvista"""
+    """build a command for a non-gui session of pyvista
+
+    Returns a ``CommandRecord`` calling the pyvista method matching
+    ``func`` on the variable of ``obj``, or ``None`` when there is none.
+    """
     import pyvista
 
+    from pyvista_gui.journal import CommandRecord
+
     func_name = func.__name__
     if func_name[0] == "_":
         func_name = func_name[1:]
@@ -28,32 +40,170 @@ def build_command(obj, func, *args, **kwargs):
     if not hasattr(obj, "class_name"):
         return
 
-    if hasattr(pyvista, obj.class_name):
-        pyvista_class = eval("pyvista.%s" % obj.class_name)
-    else:
+    pyvista_class = getattr(pyvista, obj.class_name, None)
+    if pyvista_class is None:
         return
 
     if not hasattr(pyvista_class, func_name):
         return
 
-    # convert args to strings
-    varname = obj.varname
-    str_args = []
-    for arg in args[1:]:
-        # if isinstance(arg, GuiCommon):
-        #     str_args.append(arg.varname)
-        if isinstance(arg, basestring):
-            str_args.append('"%s"' % arg)
-        else:
-            str_args.append(str(arg))
+    # arguments are kept as objects, the journal encodes them
+    return CommandRecord(obj.varname, func_name, args[1:], kwargs)
+
+
+# priority lanes of the worker pool, lower values run first
+INTERACTIVE = 0
+BATCH = 1
+
+
+class WorkerPool(object):
+    """Bounded pool of worker threads with priority lanes.
+
+    Work submitted to the ``INTERACTIVE`` lane always runs before
+    queued ``BATCH`` work, and work within a lane runs in the order it
+    was submitted.  Threads are started lazily up to ``max_workers``.
+
+    The lane is given to ``submit`` as ``_priority`` so that it does not
+    collide with a ``priority`` keyword argument of the submitted call.
+
+    Examples
+    --------
+    >>> pool = WorkerPool(max_workers=2)
+    >>> future = pool.submit(sum, [1, 2, 3], _priority=BATCH)
+    >>> future.result()
+    6
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._queue = PriorityQueue()
+        self._counter = itertools.count()
+        self._threads = []
+        self._idle = 0
+        self._lock = Lock()
+        self._shutdown = False
+
+    @property
+    def queue_depth(self):
+        """Number of submitted calls that have not started"""
+        return self._queue.qsize()
+
+    @property
+    def n_threads(self):
+        return len(self._threads)
+
+    def submit(self, fn, *args, _priority=INTERACTIVE, **kwargs):
+        """Schedule ``fn(*args, **kwargs)`` and return a ``Future``
+
+        ``_priority`` is the lane of the call, ``INTERACTIVE`` or
+        ``BATCH``.  All other arguments are passed to ``fn``.
+        """
+        if self._shutdown:
+            raise RuntimeError("cannot submit to a pool that has been shut down")
+        future = Future()
+        self._queue.put((_priority, next(self._counter), future, fn, args, kwargs))
+        self._adjust_threads()
+        return future
+
+    def _adjust_threads(self):
+        with self._lock:
+            if self._idle >= self._queue.qsize() or len(self._threads) >= self.max_workers:
+                return
+            thread = Thread(
+                target=self._worker,
+                name="pyvista_gui-worker-%d" % len(self._threads),
+                daemon=True,
+            )
+            self._threads.append(thread)
+        thread.start()
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            item = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+
+            _, _, future, fn, args, kwargs = item
+            if future is None:  # shutdown sentinel
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+            # drop references to finished work
+            del item, future, fn, args, kwargs
+
+    def shutdown(self, wait=True):
+        """Stop all workers once queued work is complete"""
+        self._shutdown = True
+        for _ in self._threads:
+            # sentinels sort after all queued work
+            self._queue.put((BATCH + 1, next(self._counter), None, None, None, None))
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+class _FutureNotifier(QObject):
+    """Relays the completion of a future to the thread owning this object"""
+
+    done = pyqtSignal()
+
+
+def wait_for_future(future):
+    """Block until ``future`` completes while still processing Qt events.
+
+    A nested ``QEventLoop`` is exited by a signal emitted when the future
+    completes, so the wait returns as soon as the work does without
+    polling.  Must be called from the GUI thread.
+    """
+    if future.done():
+        return
+    notifier = _FutureNotifier()
+    loop = QEventLoop()
+    notifier.done.connect(loop.quit)
+    # emitted from the worker thread, queued to this thread's event loop
+    future.add_done_callback(lambda _: notifier.done.emit())
+    if not future.done():
+        loop.exec_()
+
 
-    return "%s.%s(%s)" % (varname, func_name, ", ".join(str_args))
+_WORKER_POOL = None
+_WORKER_POOL_LOCK = Lock()
+
+
+def get_worker_pool():
+    """Returns the worker pool shared by the gui
+
+    The number of threads is set by ``rcParams["worker_threads"]``.
+    """
+    global _WORKER_POOL
+    with _WORKER_POOL_LOCK:
+        if _WORKER_POOL is None:
+            from pyvista_gui.options import rcParams
+
+            _WORKER_POOL = WorkerPool(rcParams.get("worker_threads"))
+        return _WORKER_POOL
 
 
 def protected_thread(fn):
     """
-    Calls a function using a thread.  Reports error under the
-    assumption the first argument is a GuiCommon class.
+    Calls a function using the shared worker pool.  Reports error under
+    the assumption the first argument is a GuiCommon class.
+
+    Calls made while a script is running (``gui.hold``) are queued in
+    the ``BATCH`` lane, all other calls in the ``INTERACTIVE`` lane.
+    Returns a ``concurrent.futures.Future``.
     """
 
     @wraps(fn)
@@ -62,9 +212,10 @@ def protected_thread(fn):
 
         def protected_fn():
             try:
-                fn(*args, **kwargs)
+                result = fn(*args, **kwargs)
                 command = build_command(self, fn, *args, **kwargs)
                 self.store_command(command)
+                return result
             except Exception as exception:
                 exc_info = sys.exc_info()
                 traceback.print_exception(*exc_info)
@@ -72,19 +223,18 @@ def protected_thread(fn):
                 if hasattr(self, "exceptions"):
                     self.exceptions.append(exception)
                 self.parent.show_error(exception)
+                raise
 
-        thread = Thread(target=protected_fn)
-        thread.start()
+        priority = BATCH if self.parent.hold else INTERACTIVE
+        future = get_worker_pool().submit(protected_fn, _priority=priority)
 
         if self.parent.hold:
-            while thread.is_alive():
-                # self.parent.render()
-                self.parent.app.processEvents()
-                time.sleep(0.1)
+            wait_for_future(future)
 
         if hasattr(self, "threads"):
-            self.threads.append(thread)
-        return thread
+            self.threads.append(future)
+            future.add_done_callback(self.threads.remove)
+        return future
 
     # wrapper.__doc__ = fn.__doc__
     # wrapper.__name__ = fn.__name__
@@ -93,11 +243,10 @@ def protected_thread(fn):
 
 
 def threaded(fn):
-    """calls a function using a thread"""
+    """calls a function using the shared worker pool"""
 
+    @wraps(fn)
     def wrapper(*args, **kwargs):
-        thread = Thread(target=fn, args=args, kwargs=kwargs)
-        thread.start()
-        return thread
+        return get_worker_pool().submit(fn, *args, _priority=BATCH, **kwargs)
 
     return wrapper
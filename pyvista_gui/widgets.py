@@ -1,46 +1,328 @@
+import bisect
+import json
 import logging
+import os
+from collections import deque
 
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QStandardItem, QStandardItemModel
-from PyQt5.QtWidgets import QPlainTextEdit, QTreeView
+from PyQt5.QtWidgets import QLineEdit, QListView, QPlainTextEdit, QTreeView, QVBoxLayout, QWidget
+
+from pyvista_gui.options import rcParams
 
 
 class QTextEditLogger(QPlainTextEdit, logging.Handler):
-    write_text_signal = pyqtSignal(str)
+    """Logging handler writing to a read-only text widget
+
+    Records may be emitted from any thread.  They are buffered in a
+    bounded queue and written to the widget in a single insert every
+    ``rcParams["log_flush_interval"]`` milliseconds.  The widget keeps at
+    most ``rcParams["log_max_lines"]`` lines, discarding the oldest.
+    """
 
     def __init__(self, parent):
         super().__init__()
         self.widget = QPlainTextEdit(parent)
         self.widget.setReadOnly(True)
-        self.write_text_signal.connect(self.widget.appendPlainText)
-
+        self.widget.setMaximumBlockCount(rcParams["log_max_lines"])
         self.widget.setFont(QFont("Courier", 12))
 
+        # deque appends and pops are atomic, no lock is needed between
+        # the emitting threads and the GUI thread
+        self._pending = deque(maxlen=rcParams["log_max_lines"])
+        self.n_emitted = 0
+        self.n_dropped = 0
+        self._n_dropped_reported = 0
+
+        self._flush_timer = QTimer(self.widget)
+        self._flush_timer.timeout.connect(self._write_pending)
+        self._flush_timer.start(rcParams["log_flush_interval"])
+
     def emit(self, record):
         msg = self.format(record)
-        self.write_text_signal.emit(msg)
+        if len(self._pending) == self._pending.maxlen:
+            self.n_dropped += 1
+        self._pending.append(msg)
+        self.n_emitted += 1
 
+    def _write_pending(self):
+        """Writes all buffered records to the widget.  Runs on the GUI thread"""
+        lines = []
+        pending = self._pending
+        while pending:
+            try:
+                lines.append(pending.popleft())
+            except IndexError:
+                break
 
-class QTextEditCommands(QPlainTextEdit):
-    """Displays commands as they are run by the GUI"""
+        dropped = self.n_dropped - self._n_dropped_reported
+        if dropped:
+            self._n_dropped_reported += dropped
+            lines.append("... %d log records dropped" % dropped)
 
-    write_text_signal = pyqtSignal(str)
+        if lines:
+            self.widget.appendPlainText("\n".join(lines))
 
-    def __init__(self, parent):
-        super(QTextEditCommands, self).__init__(parent)
-        self.setReadOnly(True)
-        self.write_text_signal.connect(self.appendPlainText)
+    def close(self):
+        """Closes the handler
+
+        ``logging.shutdown`` calls this at exit, once the Qt object may have
+        been deleted, so ``QPlainTextEdit.close`` must not shadow it.
+        """
+        logging.Handler.close(self)
+
+
+class CommandHistoryModel(QAbstractListModel):
+    """List model of the commands run by the gui
+
+    Commands may be added from any thread.  They are queued and inserted
+    into the model from the GUI thread in a single update per event loop
+    iteration.  At most ``max_entries`` commands are kept in memory; older
+    commands are appended to ``spill_filename`` as JSON lines, and all
+    recorded commands remain in the journal of ``Data``.
+
+    Rows show the first line of each command and the whole command as
+    a tooltip, so every row has the same height.
+
+    Parameters
+    ----------
+    max_entries : int
+        Number of commands kept in memory.
+
+    spill_filename : str, optional
+        File the commands dropped from memory are appended to.  By
+        default they are discarded.
+
+    """
+
+    _added = pyqtSignal()
+
+    def __init__(self, max_entries, spill_filename=None, parent=None):
+        super(CommandHistoryModel, self).__init__(parent)
+        self.max_entries = max_entries
+        self.spill_filename = spill_filename
+        self.n_spilled = 0
+
+        # entries are numbered in order of addition, _entries[0] is
+        # number _base, and evicted entries are trimmed in batches
+        self._entries = []
+        self._lower = []
+        self._base = 0
+        self._first = 0
+
+        # numbers of the entries matching the query, None when not searching
+        self._query = ""
+        self._matches = None
 
-        self.setFont(QFont("Courier", 12))
+        self._pending = deque()
+        self._flush_scheduled = False
+        self._added.connect(self._schedule_flush)
+
+    @property
+    def searching(self):
+        return self._matches is not None
+
+    @property
+    def n_entries(self):
+        """Number of commands in memory"""
+        return len(self._entries) - self._first
+
+    def entry(self, number):
+        """Command with ``number``, counted from the first command added"""
+        return self._entries[number - self._base]
+
+    def _row_number(self, row):
+        if self._matches is None:
+            return self._base + self._first + row
+        return self._matches[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._matches is None:
+            return self.n_entries
+        return len(self._matches)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        command = self.entry(self._row_number(index.row()))
+        if role == Qt.DisplayRole:
+            line, sep, _ = command.partition("\n")
+            return line + " ..." if sep else line
+        if role == Qt.ToolTipRole:
+            return command
+        return None
 
     def add_command(self, command):
-        """Writes a command to the panel"""
+        """Adds a command.  Safe to call from any thread"""
         if command:
-            self.write_text_signal.emit("%s\n" % command)
+            self._pending.append(command)
+            self._added.emit()
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        """Inserts the queued commands.  Runs on the GUI thread"""
+        self._flush_scheduled = False
+        commands = []
+        pending = self._pending
+        while pending:
+            try:
+                commands.append(pending.popleft())
+            except IndexError:
+                break
+        if not commands:
+            return
+
+        number = self._base + len(self._entries)
+        if self._matches is None:
+            n_rows = self.n_entries
+            self.beginInsertRows(QModelIndex(), n_rows, n_rows + len(commands) - 1)
+        self._entries.extend(commands)
+        self._lower.extend(command.lower() for command in commands)
+        if self._matches is None:
+            self.endInsertRows()
+        else:
+            query = self._query
+            matches = [number + i for i, command in enumerate(commands) if query in command.lower()]
+            if matches:
+                n_rows = len(self._matches)
+                self.beginInsertRows(QModelIndex(), n_rows, n_rows + len(matches) - 1)
+                self._matches.extend(matches)
+                self.endInsertRows()
+
+        if self.n_entries > self.max_entries:
+            self._evict(self.n_entries - self.max_entries)
+
+    def _evict(self, count):
+        """Drops the ``count`` oldest commands, spilling them to file"""
+        first = self._base + self._first
+        if self._matches is None:
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+        else:
+            n_rows = bisect.bisect_left(self._matches, first + count)
+            if n_rows:
+                self.beginRemoveRows(QModelIndex(), 0, n_rows - 1)
+                del self._matches[:n_rows]
+                self.endRemoveRows()
+
+        if self.spill_filename is not None:
+            with open(self.spill_filename, "a") as f:
+                for command in self._entries[self._first : self._first + count]:
+                    f.write(json.dumps(command) + "\n")
+        self.n_spilled += count
+        self._first += count
+
+        # trim the list once half of it has been evicted
+        if self._first > len(self._entries) // 2:
+            del self._entries[: self._first]
+            del self._lower[: self._first]
+            self._base += self._first
+            self._first = 0
+
+        if self._matches is None:
+            self.endRemoveRows()
+
+    def spilled(self):
+        """Commands evicted from memory, oldest first"""
+        if self.spill_filename is None or not os.path.isfile(self.spill_filename):
+            return []
+        with open(self.spill_filename) as f:
+            return [json.loads(line) for line in f]
+
+    def search(self, query):
+        """Only shows the commands containing ``query``, ignoring case
+
+        When ``query`` extends the previous query, only the previous
+        matches are searched.  An empty query shows all commands.
+        """
+        query = query.lower()
+        self.beginResetModel()
+        if not query:
+            self._matches = None
+        elif self._matches is not None and query.startswith(self._query):
+            lower = self._lower
+            base = self._base
+            self._matches = [number for number in self._matches if query in lower[number - base]]
+        else:
+            lower = self._lower
+            base = self._base
+            self._matches = [base + i for i in range(self._first, len(lower)) if query in lower[i]]
+        self._query = query
+        self.endResetModel()
+
+    def clear(self):
+        """Removes all commands, including those spilled to file"""
+        self.beginResetModel()
+        self._pending.clear()
+        self._entries = []
+        self._lower = []
+        self._base = 0
+        self._first = 0
+        if self._matches is not None:
+            self._matches = []
+        self.n_spilled = 0
+        if self.spill_filename is not None and os.path.isfile(self.spill_filename):
+            os.remove(self.spill_filename)
+        self.endResetModel()
+
+
+class CommandHistoryWidget(QWidget):
+    """Searchable list of the commands run by the gui
+
+    Backed by a ``CommandHistoryModel`` holding at most
+    ``rcParams["command_history_size"]`` commands.  Typing in the search
+    box filters the list as you type.
+    """
+
+    def __init__(self, parent, spill_filename=None):
+        super(CommandHistoryWidget, self).__init__(parent)
+        self.model = CommandHistoryModel(rcParams["command_history_size"], spill_filename, self)
+
+        self.search_box = QLineEdit(self)
+        self.search_box.setPlaceholderText("Search commands")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.model.search)
+
+        self.view = QListView(self)
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setFont(QFont("Courier", 12))
+        self.view.setSelectionMode(QListView.ExtendedSelection)
+        self.model.rowsInserted.connect(self._scroll_to_bottom)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.search_box)
+        layout.addWidget(self.view)
+
+    def _scroll_to_bottom(self):
+        if not self.model.searching:
+            self.view.scrollToBottom()
+
+    def add_command(self, command):
+        """Adds a command to the list.  Safe to call from any thread"""
+        self.model.add_command(command)
+
+    def search(self, query):
+        self.search_box.setText(query)
+
+    def clear(self):
+        self.search_box.clear()
+        self.model.clear()
 
 
 class TreeWidget(QTreeView):
-    """Displays objects as an object tree"""
+    """Displays objects as an object tree
+
+    Items are indexed by the identity of their data object and headers
+    by name, so adding, removing and renaming items does not search the
+    model.
+    """
 
     def __init__(self, parent):
         super(TreeWidget, self).__init__(parent)
@@ -55,37 +337,80 @@ class TreeWidget(QTreeView):
         self.model.setHorizontalHeaderLabels(["Objects"])
         self.model.itemChanged.connect(self.edit_name)
 
+        # id(data object) -> QStandardItem and header name -> QStandardItem
+        self._items = {}
+        self._headers = {}
+
     def edit_name(self, item):
         """Makes the name of the item in the tree matches the object name"""
         obj = item.data()
         if obj:
             obj.name = item.text()
 
-    def addItem(self, item, header, mainheader=None, editable=True):
-        """Adds item to tree"""
+    def find_item(self, data):
+        """Returns the ``QStandardItem`` holding ``data`` or ``None``"""
+        return self._items.get(id(data))
+
+    def _get_header(self, header, mainheader=None):
+        """Returns the item that new items under ``header`` are appended to"""
         if mainheader is None:
-            finds = self.model.findItems(header)
-            if not finds:
+            itemheader = self._headers.get(header)
+            if itemheader is None:
                 itemheader = QStandardItem(header)
+                itemheader.setEditable(False)
                 self.model.appendRow(itemheader)
-            else:
-                itemheader = finds[0]
-        else:
-            finds = self.model.findItems(mainheader)
-            if not finds:
-                raise Exception("main header %s does not exist" % mainheader)
-            main_itemheader = finds[0]
+                self._headers[header] = itemheader
+            return itemheader
 
-            for i in range(main_itemheader.rowCount()):
-                itemheader = main_itemheader.child(i, 0)
-                if itemheader:
-                    if header is itemheader.data():
-                        break
+        if mainheader not in self._headers:
+            raise Exception("main header %s does not exist" % mainheader)
+        itemheader = self._items.get(id(header))
+        if itemheader is None:
+            raise Exception("header %s does not exist under %s" % (header, mainheader))
+        return itemheader
 
+    def _new_item(self, item, editable):
         standardItem = QStandardItem(item.name)
         standardItem.setEditable(editable)
         standardItem.setData(item)
-        itemheader.appendRow(standardItem)
+        self._items[id(item)] = standardItem
+        return standardItem
+
+    def addItem(self, item, header, mainheader=None, editable=True):
+        """Adds item to tree"""
+        itemheader = self._get_header(header, mainheader)
+        itemheader.appendRow(self._new_item(item, editable))
+
+    def addItems(self, items, header, mainheader=None, editable=True):
+        """Adds many items to the tree with a single model update"""
+        itemheader = self._get_header(header, mainheader)
+        itemheader.appendRows([self._new_item(item, editable) for item in items])
+
+    def rename_item(self, data, name):
+        """Renames the tree item holding ``data``"""
+        standardItem = self._items.get(id(data))
+        if standardItem is not None:
+            standardItem.setText(name)
+
+    def rename_header(self, header, name):
+        """Renames a top level header"""
+        itemheader = self._headers.pop(header)
+        itemheader.setText(name)
+        self._headers[name] = itemheader
+
+    def expanded_headers(self):
+        """Names of the expanded top level headers"""
+        return [
+            name
+            for name, itemheader in self._headers.items()
+            if self.isExpanded(itemheader.index())
+        ]
+
+    def expand_headers(self, names):
+        """Expands the top level headers in ``names``"""
+        for name in names:
+            if name in self._headers:
+                self.setExpanded(self._headers[name].index(), True)
 
     def open_menu(self, position):  # pragma: no cover
         """Activates when right click in tree"""
@@ -101,33 +426,36 @@ class TreeWidget(QTreeView):
             menu.exec_(self.viewport().mapToGlobal(position))
             return menu
 
+    def _unindex(self, standardItem):
+        """Removes an item and all of its children from the index"""
+        stack = [standardItem]
+        while stack:
+            item = stack.pop()
+            data = item.data()
+            if data is not None:
+                self._items.pop(id(data), None)
+                item.setData(None)
+            stack.extend(item.child(i, 0) for i in range(item.rowCount()))
+
     def remove_item(self, data):
         """removes an item from the modal list"""
-        removed = False
-        # check each header for a match
-        for i in range(self.model.rowCount()):
-            header = self.model.item(i)
-            for i in range(header.rowCount()):
-                item = header.child(i, 0)
-                if item:
-                    if data is item.data():
-                        item.setData(None)
-                        header.removeRow(i)
-                        removed = removed or True
-                        break
-
-                if item.hasChildren():
-                    for j in range(item.rowCount()):
-                        subitem = item.child(j, 0)
-                        if data is subitem.data():
-                            subitem.setData(None)
-                            item.removeRow(j)
-                            removed = removed or True
-                            break
-
-            # remove empty headers
-            if not header.rowCount():
-                self.model.removeRow(header.row())
-                break
+        standardItem = self._items.get(id(data))
+        if standardItem is None:
+            return False
+
+        parent = standardItem.parent()
+        self._unindex(standardItem)
+        parent.removeRow(standardItem.row())
+
+        # remove empty headers
+        if not parent.rowCount() and parent.parent() is None:
+            self._headers.pop(parent.text(), None)
+            self.model.removeRow(parent.row())
+
+        return True
 
-        return removed
+    def clear(self):
+        """Removes all items and headers"""
+        self._items.clear()
+        self._headers.clear()
+        self.model.removeRows(0, self.model.rowCount())
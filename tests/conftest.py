@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def user_data_path(tmp_path_factory):
+    """Keeps the rcParams, journal and mesh cache of the tests out of the user's"""
+    from pyvista_gui import data, options
+
+    path = str(tmp_path_factory.mktemp("user_data"))
+    saved = dict(options.rcParams)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(options, "USER_DATA_PATH", path)
+        mp.setattr(data, "USER_DATA_PATH", path)
+        mp.setattr(options.RcParams, "filename", os.path.join(path, "rcParams.json"))
+        dict.clear(options.rcParams)
+        dict.update(options.rcParams, options.DEFAULTS)
+        yield path
+        # written to the temporary file, not at exit to the user's
+        options.rcParams.flush()
+        dict.clear(options.rcParams)
+        dict.update(options.rcParams, saved)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture(scope="session")
+def gui(qapp):
+    from pyvista_gui.gui import GUIWindow
+
+    window = GUIWindow(app=qapp, off_screen_vtk=True, show=False)
+    yield window
+    window.close()
+
+
+@pytest.fixture
+def wait_for(qapp):
+    """Returns a function processing Qt events until a signal is emitted
+
+    It returns the arguments of the signal and fails the test when the
+    signal is not emitted within ``timeout`` ms.
+    """
+    from PyQt5.QtCore import QEventLoop, QTimer
+
+    def wait_for(signal, timeout=10000):
+        received = []
+        loop = QEventLoop()
+
+        def on_signal(*args):
+            received.append(args)
+            loop.quit()
+
+        signal.connect(on_signal)
+        QTimer.singleShot(timeout, loop.quit)
+        loop.exec_()
+        signal.disconnect(on_signal)
+        assert received, "timed out waiting for signal"
+        return received[0]
+
+    return wait_for
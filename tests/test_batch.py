@@ -0,0 +1,72 @@
+import os
+
+import pyvista
+
+from pyvista_gui.__main__ import batch_main
+from pyvista_gui.batch import actor_style, apply_style, render_parallel, run_batch, scene_actors
+
+STYLED_SCRIPT = """\
+sphere = pyvista.Sphere()
+sphere["z"] = sphere.points[:, 2]
+plotter.add_mesh(sphere, scalars="z", cmap="coolwarm", clim=[-1, 1], opacity=0.5, show_edges=True)
+plotter.add_mesh(pyvista.Cube(center=(2, 0, 0)), color="red")
+"""
+
+
+def test_actor_style_restored():
+    plotter = pyvista.Plotter(off_screen=True)
+    source = pyvista.Sphere()
+    source["z"] = source.points[:, 2]
+    actor = plotter.add_mesh(source, scalars="z", cmap="coolwarm", clim=[-1, 1], opacity=0.5)
+    style = actor_style(actor)
+
+    copy = plotter.add_mesh(pyvista.Sphere(), color="red")
+    apply_style(copy, style)
+
+    assert actor_style(copy)["scalars"] == "z"
+    assert copy.GetProperty().GetOpacity() == 0.5
+    assert copy.GetMapper().GetScalarRange() == (-1.0, 1.0)
+    assert copy.GetMapper().GetLookupTable().GetTableValue(0) == (
+        actor.GetMapper().GetLookupTable().GetTableValue(0)
+    )
+    plotter.close()
+
+
+def test_scene_actors_have_data():
+    plotter = pyvista.Plotter(off_screen=True)
+    namespace = {"pyvista": pyvista, "plotter": plotter}
+    exec(STYLED_SCRIPT, namespace)
+
+    meshes = [mesh for _, mesh, _ in scene_actors(plotter)]
+
+    assert [mesh.n_points for mesh in meshes] == [namespace["sphere"].n_points, 8]
+    plotter.close()
+
+
+def test_render_parallel_script_uses_plotter(tmp_path):
+    script = tmp_path / "styled.py"
+    script.write_text(STYLED_SCRIPT)
+
+    written = render_parallel(
+        str(script), str(tmp_path / "frames"), n_frames=2, processes=1, window_size=(64, 64)
+    )
+
+    assert [os.path.basename(filename) for filename in written] == [
+        "frame_00000.png",
+        "frame_00001.png",
+    ]
+    assert all(os.path.getsize(filename) for filename in written)
+
+
+def test_run_batch_skips_failed_scripts(tmp_path):
+    good = tmp_path / "good.py"
+    good.write_text("sphere = pyvista.Sphere()\n")
+    bad = tmp_path / "bad.py"
+    bad.write_text("raise RuntimeError('bad script')\n")
+    output = tmp_path / "figures"
+
+    written = run_batch([str(bad), str(good)], str(output), window_size=(64, 64))
+
+    assert written == [str(output / "good.png")]
+    assert os.path.getsize(written[0])
+    assert batch_main([str(bad)], str(output), window_size=(64, 64)) == 1
@@ -0,0 +1,89 @@
+import errno
+import os
+
+import numpy as np
+import pytest
+import pyvista
+
+from pyvista_gui import cache as cache_module
+from pyvista_gui import mesh_arrays
+from pyvista_gui.cache import MeshCache
+from pyvista_gui.loader import MeshLoader
+
+
+@pytest.fixture
+def sphere_file(tmp_path):
+    filename = str(tmp_path / "sphere.vtk")
+    pyvista.Sphere().save(filename)
+    return filename
+
+
+def test_loader_emits_mesh_when_cache_write_fails(tmp_path, sphere_file, monkeypatch):
+    def write_container(*args):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(cache_module, "write_container", write_container)
+    loader = MeshLoader(sphere_file, cache=MeshCache(str(tmp_path / "cache"), 1024**3))
+    loaded, failed = [], []
+    loader.loaded.connect(lambda mesh, filename: loaded.append(mesh))
+    loader.failed.connect(lambda *args: failed.append(args))
+
+    loader.run()
+    loader.cache_write.result()
+
+    assert not failed
+    assert loaded[0].n_cells == pyvista.Sphere().n_cells
+
+
+def test_loader_emits_mesh_before_caching_it(tmp_path, sphere_file):
+    mesh_cache = MeshCache(str(tmp_path / "cache"), 1024**3)
+    loader = MeshLoader(sphere_file, cache=mesh_cache)
+    events = []
+    loader.loaded.connect(lambda mesh, filename: events.append("loaded"))
+    put = mesh_cache.put
+    mesh_cache.put = lambda *args: events.append("put") or put(*args)
+
+    loader.run()
+    assert loader.cache_write.result() is None
+
+    assert events == ["loaded", "put"]
+    assert mesh_cache.stats["entries"] == 1
+    cached = MeshLoader(sphere_file, cache=mesh_cache)
+    cached.run()
+    assert cached.cache_write is None
+    assert mesh_cache.hits == 1
+
+
+def test_unreadable_entry_removed_and_missed(tmp_path, sphere_file):
+    mesh_cache = MeshCache(str(tmp_path / "cache"), 1024**3)
+    mesh_cache.put(sphere_file, pyvista.read(sphere_file))
+    meta, arrays = mesh_arrays.read_container(mesh_cache._entry(sphere_file))
+    meta["type"] = "NotADataset"
+    mesh_arrays.write_container(mesh_cache._entry(sphere_file), meta, arrays)
+
+    assert mesh_cache.get(sphere_file) is None
+    assert mesh_cache.misses == 1
+    assert mesh_cache.stats["entries"] == 0
+
+    loader = MeshLoader(sphere_file, cache=mesh_cache)
+    loaded = []
+    loader.loaded.connect(lambda mesh, filename: loaded.append(mesh))
+    loader.run()
+    assert loaded[0].n_cells == pyvista.Sphere().n_cells
+
+
+def test_put_skips_entries_larger_than_cache(tmp_path, sphere_file):
+    mesh_cache = MeshCache(str(tmp_path / "cache"), 1024)
+    assert not mesh_cache.put(sphere_file, pyvista.read(sphere_file))
+    assert mesh_cache.stats["entries"] == 0
+    assert mesh_cache.evictions == 0
+
+
+def test_write_container_removes_temporary_file(tmp_path, monkeypatch):
+    def replace(*args):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(mesh_arrays.os, "replace", replace)
+    with pytest.raises(OSError):
+        mesh_arrays.write_container(str(tmp_path / "full.pvds"), {}, {"x": np.arange(10)})
+    assert os.listdir(str(tmp_path)) == []
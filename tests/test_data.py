@@ -0,0 +1,65 @@
+import pyvista
+from PyQt5.QtCore import QTimer
+
+
+def test_load_mesh_waits_while_gui_held(gui, tmp_path):
+    filename = str(tmp_path / "sphere.vtk")
+    pyvista.Sphere().save(filename)
+    n_meshes = len(gui.data.meshes)
+
+    gui.hold = True
+    try:
+        gui.data.load_mesh(filename)
+    finally:
+        gui.hold = False
+
+    assert len(gui.data.meshes) == n_meshes + 1
+    assert gui.data.meshes[-1].mesh.n_cells == pyvista.Sphere().n_cells
+
+
+def test_new_mesh_does_not_take_console_variable(gui, wait_for):
+    varname = "Mesh%d" % gui.data.varcount["Mesh"]
+    gui.console.start_kernel()
+    # once the console has handled the replies of a kernel just started
+    QTimer.singleShot(
+        0, lambda: gui.console.execute("import pyvista; %s = pyvista.Sphere()" % varname)
+    )
+    wait_for(gui.console.executed)
+    sphere = gui.console.variables[varname]
+
+    gui_mesh = gui.data.load_mesh(pyvista.Cube())
+
+    assert gui_mesh.varname != varname
+    assert gui.console.variables[varname] is sphere
+    assert gui.console.variables[gui_mesh.varname] is gui_mesh.mesh
+    assert gui.data.find_mesh(sphere).actor is not None
+    assert gui.plotter.renderer.actors[varname].GetMapper().GetInput() is sphere
+
+
+def test_gui_keeps_out_of_user_data(gui, user_data_path):
+    assert gui.data.journal.directory.startswith(user_data_path)
+    assert gui.command_history.model.spill_filename.startswith(user_data_path)
+
+
+def test_autosave_appends_new_commands(gui, tmp_path):
+    filename = str(tmp_path / "autosave.py")
+    n_records = len(gui.data.journal)
+    assert gui.data.autosave(filename) == n_records
+    with open(filename) as f:
+        saved = f.read()
+    assert gui.data.autosave(filename) == 0
+
+    mesh_file = str(tmp_path / "sphere.vtk")
+    pyvista.Sphere().save(mesh_file)
+    gui.hold = True
+    try:
+        gui.data.load_mesh(mesh_file)
+    finally:
+        gui.hold = False
+
+    assert gui.data.autosave(filename) == 1
+    varname = gui.data.meshes[-1].varname
+    with open(filename) as f:
+        appended = f.read()
+    assert appended.startswith(saved)
+    assert appended[len(saved) :] == "%s = pyvista.read(%r)\n" % (varname, mesh_file)
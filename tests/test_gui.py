@@ -0,0 +1,34 @@
+import logging
+
+from PyQt5 import sip
+
+
+def test_close_removes_log_handler(qapp):
+    from pyvista_gui.gui import GUIWindow
+
+    window = GUIWindow(app=qapp, off_screen_vtk=True, show=False)
+    handler = window.textbox_logger
+    assert handler in logging.getLogger().handlers
+
+    window.close()
+    assert handler not in logging.getLogger().handlers
+
+    # as logging.shutdown does at exit
+    sip.delete(handler)
+    handler.close()
+
+
+def test_dark_style_sheet_applied_once(gui, monkeypatch):
+    from pyvista_gui.utilities import dark_stylesheet
+
+    applied = []
+    monkeypatch.setattr(gui, "setStyleSheet", applied.append)
+    gui.enable_dark_mode(False)
+    applied.clear()
+
+    gui.enable_dark_mode(True)
+    gui.enable_dark_mode(True)
+    gui.enable_dark_mode(False)
+
+    assert applied == [dark_stylesheet(), gui.default_style_sheet]
+    assert dark_stylesheet() is dark_stylesheet()
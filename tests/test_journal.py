@@ -0,0 +1,91 @@
+import os
+import threading
+from pathlib import PureWindowsPath
+
+import numpy as np
+
+from pyvista_gui.journal import (
+    MAX_SESSIONS,
+    CommandJournal,
+    CommandRecord,
+    crashed,
+    new_session,
+    sessions,
+)
+
+
+def test_append_from_threads(tmp_path):
+    journal = CommandJournal(str(tmp_path))
+
+    def append(i):
+        for j in range(50):
+            journal.append(CommandRecord("Mesh0", "rotate_x", [np.full(32, i * 50 + j)]))
+
+    threads = [threading.Thread(target=append, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+
+    loaded = CommandJournal.load(str(tmp_path))
+    assert len(loaded) == 200
+    paths = {record.args[0]["npy"] for record in loaded}
+    assert len(paths) == 200
+    assert sorted(int(np.load(os.path.join(str(tmp_path), path))[0]) for path in paths) == list(
+        range(200)
+    )
+
+
+def test_export_arrays(tmp_path):
+    journal = CommandJournal(str(tmp_path / "journal"))
+    record = journal.append(CommandRecord("Mesh0", "translate", [np.arange(100.0)]))
+    directory = str(tmp_path / "script_files")
+
+    journal.export_arrays(record, directory)
+    source = journal.render(record, directory)
+
+    path = os.path.join(directory, record.args[0]["npy"])
+    assert os.path.isfile(path)
+    assert path.replace("\\", "/") in source
+
+
+def test_new_session_keeps_latest(tmp_path):
+    root = str(tmp_path)
+    for i in range(MAX_SESSIONS):
+        os.mkdir(os.path.join(root, "20000101-0000%02d-old" % i))
+    directory = new_session(root)
+    assert sessions(root)[0] == directory
+    assert len(sessions(root)) == MAX_SESSIONS
+    assert not os.path.exists(os.path.join(root, "20000101-000000-old"))
+
+
+def test_strings_rendered_as_python(tmp_path):
+    journal = CommandJournal(str(tmp_path))
+    text = 'a\\b "c"\nd'
+    record = journal.append(CommandRecord("Mesh0", "add_text", [text]))
+
+    assert eval(journal.render(record)[len("Mesh0.add_text") :]) == text
+
+
+def test_paths_normalised(tmp_path):
+    journal = CommandJournal(str(tmp_path))
+    record = journal.append(
+        CommandRecord("pyvista", "read", [PureWindowsPath(r"C:\data\it's.vtk")])
+    )
+    journal.close()
+
+    expected = "pyvista.read(%r)" % "C:/data/it's.vtk"
+    assert journal.render(record) == expected
+    assert journal.render(CommandJournal.load(str(tmp_path))[0]) == expected
+
+
+def test_crashed(tmp_path):
+    journal = CommandJournal(str(tmp_path))
+    assert not crashed(str(tmp_path))
+    journal.append(CommandRecord("Mesh0", "rotate_x", [90]))
+    assert crashed(str(tmp_path))
+
+    journal.close()
+
+    assert not crashed(str(tmp_path))
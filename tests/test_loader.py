@@ -0,0 +1,50 @@
+import pyvista
+
+from pyvista_gui.loader import StreamingMeshLoader, read_pieces
+
+
+def write_multiblock(tmp_path):
+    filename = str(tmp_path / "blocks.vtm")
+    pyvista.MultiBlock({"sphere": pyvista.Sphere(), "cube": pyvista.Cube()}).save(filename)
+    return filename
+
+
+def test_streamed_load_stores_one_command(gui, tmp_path, wait_for):
+    filename = write_multiblock(tmp_path)
+    n_commands = len(gui.data.commands)
+
+    loader = gui.data.load_mesh(filename, stream=True)
+    wait_for(loader.finished)
+
+    commands = gui.data.commands[n_commands:]
+    assert len(commands) == 1
+    assert "read_pieces" in commands[0]
+    namespace = {}
+    exec("import pyvista_gui.loader\n" + commands[0], namespace)
+    names = [gui_mesh.varname for gui_mesh in gui.data.meshes[-2:]]
+    assert [namespace[name].n_cells for name in names] == [
+        gui_mesh.mesh.n_cells for gui_mesh in gui.data.meshes[-2:]
+    ]
+
+
+def test_cancelled_stream_stores_no_command(gui, tmp_path, monkeypatch, wait_for):
+    filename = write_multiblock(tmp_path)
+    n_commands = len(gui.data.commands)
+    read_piece = StreamingMeshLoader.read_piece
+
+    def cancelled_read_piece(self, filename):
+        # cancelled while reading the second piece
+        if self.n_pieces:
+            self.cancel()
+        return read_piece(self, filename)
+
+    monkeypatch.setattr(StreamingMeshLoader, "read_piece", cancelled_read_piece)
+    loader = gui.data.load_mesh(filename, stream=True)
+    wait_for(loader.finished)
+
+    assert gui.data.commands[n_commands:] == []
+
+
+def test_read_pieces(tmp_path):
+    pieces = read_pieces(write_multiblock(tmp_path))
+    assert [piece.n_cells for piece in pieces] == [pyvista.Sphere().n_cells, pyvista.Cube().n_cells]
@@ -0,0 +1,26 @@
+import gc
+import weakref
+
+import pyvista
+from PyQt5.QtCore import QCoreApplication, QEvent
+
+
+def flush_deletes():
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+
+
+def test_show_blocks_releases_previous_model(gui):
+    first = gui.data.load_mesh(pyvista.MultiBlock([pyvista.Sphere()]))
+    second = gui.data.load_mesh(pyvista.MultiBlock([pyvista.Cube()]))
+
+    gui.show_blocks(first)
+    model = weakref.ref(gui.dock_blocks.widget().model())
+    gui.show_blocks(second)
+    flush_deletes()
+    assert model() is None
+
+    second.remove()
+    flush_deletes()
+    assert gui.dock_blocks.widget().model() is None
+    first.remove()
@@ -0,0 +1,58 @@
+import json
+import threading
+import time
+
+from pyvista_gui.options import RcParams
+
+
+def new_params(tmp_path, **kwargs):
+    params = RcParams(a=1, b=2)
+    params.filename = str(tmp_path / "rcParams.json")
+    params.delay = 0.05
+    params.update(**kwargs)
+    return params
+
+
+def read(params):
+    with open(params.filename) as f:
+        return json.load(f)
+
+
+def wait_written(params, timeout=5.0):
+    end = time.monotonic() + timeout
+    while params._dirty or params._deadline is not None:
+        assert time.monotonic() < end, "timed out waiting for the write"
+        time.sleep(0.01)
+    # written while holding the lock
+    with params._lock:
+        return read(params)
+
+
+def test_changes_written_behind_by_one_thread(tmp_path):
+    params = new_params(tmp_path)
+    n_threads = threading.active_count()
+    for value in range(100):
+        params["a"] = value
+
+    assert threading.active_count() <= n_threads + 1
+    assert wait_written(params) == {"a": 99}
+
+
+def test_unchanged_values_not_written(tmp_path):
+    params = new_params(tmp_path)
+    params["a"] = 1
+    params.update(a=1, b=2)
+
+    assert not params._dirty
+    assert params._deadline is None
+
+
+def test_changed_keys_merged_with_file(tmp_path):
+    params = new_params(tmp_path)
+    with open(params.filename, "w") as f:
+        json.dump({"a": 1, "b": 2, "other": 3}, f)
+
+    params.update(a=5, b=2)
+    params.flush()
+
+    assert read(params) == {"a": 5, "b": 2, "other": 3}
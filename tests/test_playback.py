@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+import pyvista
+
+from pyvista_gui.options import rcParams
+from pyvista_gui.playback import FrameCache
+
+
+def test_frame_cache_read_error(tmp_path):
+    def read(filename):
+        if filename.endswith("1.vtk"):
+            raise OSError("corrupt step")
+        return pyvista.Sphere()
+
+    cache = FrameCache(["step0.vtk", "step1.vtk", "step2.vtk"], 4, read)
+    with pytest.raises(OSError):
+        cache.wait(1)
+
+    assert cache.get(1) is None
+    assert cache._futures == {}
+    assert isinstance(cache.errors[1], OSError)
+    # other steps are still read
+    assert cache.wait(2).n_cells == pyvista.Sphere().n_cells
+
+
+def test_player_skips_unreadable_steps(gui, tmp_path):
+    filenames = []
+    for i in range(3):
+        filenames.append(str(tmp_path / ("step%d.vtk" % i)))
+        pyvista.Sphere(radius=i + 1).save(filenames[-1])
+    os.remove(filenames[1])
+
+    player = gui.data.load_time_series(filenames)
+    player.loop = False
+    for index in range(1, 3):
+        # ticks until the step is read, then shown or skipped
+        for _ in range(100):
+            future = player.cache._futures.get(index)
+            if future is not None:
+                wait([future])
+            player._tick()
+            if player.index == index:
+                break
+
+    assert player.index == 2
+    assert player.stats["skipped"] == 1
+    assert player.gui_mesh.mesh.bounds[1] == pytest.approx(3, rel=0.01)
+    player.gui_mesh.remove()
+
+
+def _series(tmp_path, n_steps=3):
+    filenames = []
+    for i in range(n_steps):
+        filenames.append(str(tmp_path / ("step%d.vtk" % i)))
+        pyvista.Sphere(radius=i + 1).save(filenames[-1])
+    return filenames
+
+
+def _process_until(qapp, condition, timeout=10.0):
+    tstart = time.perf_counter()
+    while not condition():
+        assert time.perf_counter() - tstart < timeout, "timed out"
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def test_seek_does_not_block(gui, tmp_path, wait_for):
+    player = gui.data.load_time_series(_series(tmp_path))
+    released = threading.Event()
+    player.cache.clear()
+    player.cache.read = lambda filename: released.wait(10) and pyvista.read(filename)
+
+    assert player.seek(1)
+    assert player.seek(2)
+    assert player.index == 0
+    released.set()
+    # only the last step sought is shown
+    assert wait_for(player.frame_changed) == (2,)
+    assert player.stats["shown"] == 1
+    assert player.gui_mesh.mesh.bounds[1] == pytest.approx(3, rel=0.01)
+    player.close()
+    player.gui_mesh.remove()
+
+
+def test_steps_not_in_mesh_cache(gui, tmp_path):
+    filenames = _series(tmp_path)
+    player = gui.data.load_time_series(filenames)
+    wait([future for future in player.cache._futures.values() if future is not None])
+
+    assert player.cache.n_read == len(filenames)
+    assert all(gui.data.cache.get(filename) is None for filename in filenames)
+    player.close()
+    player.gui_mesh.remove()
+
+
+def test_lod_proxy_refreshed(gui, qapp, tmp_path, monkeypatch):
+    monkeypatch.setitem(rcParams, "lod_threshold", 10)
+    monkeypatch.setitem(rcParams, "lod_budget", 100)
+    player = gui.data.load_time_series(_series(tmp_path))
+    key = id(player.gui_mesh)
+    _process_until(qapp, lambda: key in gui.lod._proxies)
+    first = gui.lod._proxies[key][1].GetMapper().GetInput().GetBounds()
+
+    player.seek(2)
+    _process_until(qapp, lambda: player.index == 2)
+    # the proxy of the first step is never shown with the last
+    assert key not in gui.lod._proxies
+    _process_until(qapp, lambda: key in gui.lod._proxies)
+    proxy = gui.lod._proxies[key][1].GetMapper().GetInput()
+    # the steps are spheres of radius 1 and 3
+    assert proxy.GetBounds() == pytest.approx([3 * bound for bound in first], abs=1e-4)
+    player.close()
+    player.gui_mesh.remove()
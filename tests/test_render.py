@@ -0,0 +1,17 @@
+from pyvista_gui.render import RenderScheduler
+
+
+def test_requests_coalesced_into_one_render(qapp, wait_for):
+    renders = []
+    scheduler = RenderScheduler(lambda: renders.append(1), max_fps=30)
+    for _ in range(100):
+        scheduler.request()
+    assert scheduler.pending
+
+    wait_for(scheduler._timer.timeout)
+    qapp.processEvents()
+
+    assert renders == [1]
+    assert not scheduler.pending
+    assert scheduler.stats["requested"] == 100
+    assert scheduler.stats["coalesced"] == 99
@@ -0,0 +1,52 @@
+import pyvista
+
+from pyvista_gui.batch import run_batch
+from pyvista_gui.script import uses_gui
+
+
+def test_script_uses_mesh_it_loaded(gui, tmp_path, wait_for):
+    filename = str(tmp_path / "sphere.vtk")
+    pyvista.Sphere().save(filename)
+    script = tmp_path / "script.py"
+    source = "gui.data.load_mesh(%r)\nn_cells = gui.data.meshes[-1].mesh.n_cells\n"
+    script.write_text(source % filename)
+
+    n_meshes = len(gui.data.meshes)
+    runner = gui.data.load_script(str(script))
+    (completed,) = wait_for(runner.finished)
+
+    assert completed
+    assert len(gui.data.meshes) == n_meshes + 1
+    assert gui.console.variables["n_cells"] == pyvista.Sphere().n_cells
+
+
+def test_saved_replay_runs_in_batch(gui, tmp_path, wait_for):
+    filename = str(tmp_path / "sphere.vtk")
+    pyvista.Sphere().save(filename)
+    script = tmp_path / "script.py"
+    source = "gui.data.load_mesh(%r)\nimport pyvista\ncube = pyvista.Cube(center=(2, 0, 0))\n"
+    script.write_text(source % filename)
+    gui.data.reset()
+
+    runner = gui.data.load_script(str(script))
+    (completed,) = wait_for(runner.finished)
+    assert completed
+    assert gui.save_commands
+    saved = str(tmp_path / "saved.py")
+    gui.data._save_commands(saved)
+
+    with open(saved) as f:
+        replay = f.read()
+    assert replay.count("pyvista.read(%r)" % filename) == 1
+    assert "gui." not in replay
+    assert "cube = pyvista.Cube(center=(2, 0, 0))" in replay
+    assert run_batch([saved], str(tmp_path / "figures"), window_size=(64, 64)) == [
+        str(tmp_path / "figures" / "saved.png")
+    ]
+
+
+def test_uses_gui():
+    assert uses_gui("gui.data.load_mesh('a.vtk')")
+    assert uses_gui("n = len(gui.data.meshes)")
+    assert not uses_gui("mesh = pyvista.Sphere()")
+    assert not uses_gui("mesh.gui = 1")
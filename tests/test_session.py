@@ -0,0 +1,61 @@
+import numpy as np
+import pyvista
+
+
+def test_session_round_trip(gui, tmp_path):
+    gui.data.reset()
+    sphere = pyvista.Sphere()
+    sphere["z"] = sphere.points[:, 2]
+    sphere.field_data["labels"] = np.array(["top", "bottom"])
+    gui.data.load_mesh(sphere, name="sphere")
+    gui.data.load_mesh(pyvista.Cube(), name="cube")
+    gui.plotter.set_background([0.1, 0.2, 0.3])
+    background = gui.plotter.renderer.GetBackground()
+    camera_position = gui.plotter.camera_position
+    filename = str(tmp_path / "session.pvgui")
+
+    assert gui.data.save(filename)
+    gui.data.reset()
+    assert gui.data.load_session(filename)
+
+    assert [mesh.name for mesh in gui.data.meshes] == ["sphere", "cube"]
+    loaded = gui.data.meshes[0].mesh
+    assert np.array_equal(loaded.points, sphere.points)
+    assert np.array_equal(loaded["z"], sphere["z"])
+    assert list(loaded.field_data["labels"]) == ["top", "bottom"]
+    assert gui.data.meshes[1].mesh.n_cells == pyvista.Cube().n_cells
+    assert gui.plotter.renderer.GetBackground() == background
+    assert gui.plotter.camera_position == camera_position
+
+
+def test_session_errors_shown(gui, tmp_path):
+    errors = []
+    gui.errorsignal.connect(lambda *args: errors.append(args))
+    gui.data.reset()
+    gui.data.load_mesh(pyvista.PointSet(np.random.random((10, 3))), name="points")
+
+    assert not gui.data.save(str(tmp_path / "session.pvgui"))
+    assert errors[-1][0] == "Unable to save session"
+    assert not (tmp_path / "session.pvgui").exists()
+
+    corrupt = tmp_path / "corrupt.pvgui"
+    corrupt.write_bytes(b"not a session")
+    assert not gui.data.load_session(str(corrupt))
+    assert errors[-1][0] == "Unable to load session"
+    assert [mesh.name for mesh in gui.data.meshes] == ["points"]
+
+
+def test_unsupported_arrays_skipped_with_warning(caplog):
+    from vtkmodules.vtkCommonCore import vtkVariantArray
+
+    from pyvista_gui.mesh_arrays import dataset_to_arrays
+
+    mesh = pyvista.Sphere()
+    variants = vtkVariantArray()
+    variants.SetName("variants")
+    mesh.GetFieldData().AddArray(variants)
+
+    meta, arrays = dataset_to_arrays(mesh)
+
+    assert meta["field_data"] == []
+    assert "vtkVariantArray array variants" in caplog.text
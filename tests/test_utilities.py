@@ -0,0 +1,13 @@
+from pyvista_gui.utilities import BATCH, WorkerPool
+
+
+def test_submit_passes_priority_to_the_call():
+    def task(value, priority=None):
+        return value, priority
+
+    pool = WorkerPool(max_workers=1)
+    try:
+        future = pool.submit(task, 1, priority="high", _priority=BATCH)
+        assert future.result(timeout=10) == (1, "high")
+    finally:
+        pool.shutdown()
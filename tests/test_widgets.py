@@ -0,0 +1,104 @@
+import logging
+
+from pyvista_gui.widgets import CommandHistoryModel, QTextEditLogger, TreeWidget
+
+
+def test_log_records_written_in_batches(gui):
+    handler = QTextEditLogger(gui)
+    handler._flush_timer.stop()
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "line %d", (0,), None)
+    maxlen = handler._pending.maxlen
+    for _ in range(maxlen + 5):
+        handler.emit(record)
+
+    handler._write_pending()
+
+    text = handler.widget.toPlainText().splitlines()
+    assert handler.n_dropped == 5
+    assert len(text) <= maxlen
+    assert text[-1] == "... 5 log records dropped"
+
+
+class Item:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_tree_rename_keeps_items_and_expand_state(qapp):
+    tree = TreeWidget(None)
+    items = [Item("a"), Item("b")]
+    tree.addItems(items, "Meshes")
+    tree.expand_headers(["Meshes"])
+
+    tree.rename_item(items[0], "c")
+    tree.rename_header("Meshes", "Datasets")
+
+    assert tree.find_item(items[0]).text() == "c"
+    assert tree.expanded_headers() == ["Datasets"]
+    tree.addItem(Item("d"), "Datasets")
+    assert tree.model.rowCount() == 1
+    assert tree._headers["Datasets"].rowCount() == 3
+
+
+def test_tree_edit_renames_object(qapp):
+    tree = TreeWidget(None)
+    item = Item("a")
+    tree.addItem(item, "Meshes")
+
+    tree.find_item(item).setText("b")
+
+    assert item.name == "b"
+
+
+def test_tree_remove_drops_empty_header(qapp):
+    tree = TreeWidget(None)
+    items = [Item("a"), Item("b")]
+    tree.addItems(items, "Meshes")
+
+    assert tree.remove_item(items[0])
+    assert tree.find_item(items[0]) is None
+    assert tree.model.rowCount() == 1
+    assert tree.remove_item(items[1])
+    assert tree.model.rowCount() == 0
+    assert not tree.remove_item(items[1])
+
+
+def rows(model):
+    return [model.data(model.index(row)) for row in range(model.rowCount())]
+
+
+def test_history_spills_oldest_commands(qapp, tmp_path):
+    model = CommandHistoryModel(4, str(tmp_path / "history.jsonl"))
+    for i in range(10):
+        model.add_command("mesh%d.rotate_x(%d)" % (i, i))
+    model._flush()
+
+    assert rows(model) == ["mesh%d.rotate_x(%d)" % (i, i) for i in range(6, 10)]
+    assert model.n_spilled == 6
+    assert model.spilled() == ["mesh%d.rotate_x(%d)" % (i, i) for i in range(6)]
+
+    model.clear()
+    assert rows(model) == []
+    assert model.spilled() == []
+
+
+def test_history_search(qapp):
+    model = CommandHistoryModel(5)
+    for command in ["Mesh0.rotate_x(1)", "mesh1.translate([1, 0, 0])", "MESH2.rotate_y(2)"]:
+        model.add_command(command)
+    model._flush()
+
+    model.search("ROTATE")
+    assert rows(model) == ["Mesh0.rotate_x(1)", "MESH2.rotate_y(2)"]
+    model.search("rotate_y")
+    assert rows(model) == ["MESH2.rotate_y(2)"]
+
+    # new commands matching the query are shown, evicted ones removed
+    model.add_command("mesh3.rotate_y(3)\nmesh3.plot()")
+    for i in range(4):
+        model.add_command("mesh%d.scale(2)" % (i + 4))
+    model._flush()
+    assert rows(model) == ["mesh3.rotate_y(3) ..."]
+
+    model.search("")
+    assert len(rows(model)) == 5